@@ -0,0 +1,246 @@
+# minervini/app/jobs.py
+import asyncio
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+from config import screen_workers, job_result_ttl
+from core.metrics import metrics, collect_timings
+from strategies.minervini import stream_minervini, pipeline
+from utils.market_session import now_kst
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+class ScreenJob:
+    """
+    스크리닝 작업 하나의 상태. 워커 스레드가 갱신하고 API가 읽습니다.
+
+    진행 이벤트(rows / patch / error / done)를 순서대로 보관하고, follow()로 다른 이벤트 루프에서
+    처음부터 이어 받을 수 있습니다 (POST /filter/stream).
+    """
+
+    def __init__(self, condition_name):
+        self.id = uuid.uuid4().hex
+        self.condition_name = condition_name
+        self.status = 'queued'  # queued / running / done / failed
+        self.rows = None        # 조건검색 결과 종목 수
+        self.stages = {}        # 단계 이름 -> 'done' / 'failed'
+        self.entry = None       # ScreenCache 항목 {'data', 'computed_at', 'timings'}
+        self.stale = False      # 만료된 캐시 결과로 바로 끝난 작업
+        self.refresh_job = None # 이때 큐에 올린 갱신 작업 id
+        self.error = None
+        self.timings = None     # 계산 당시 단계 / 외부 호출 타이밍 요약
+        self.events = []        # {'type': 'rows' | 'patch' | 'error' | 'done', ...}
+        self._listeners = []    # (이벤트 루프, asyncio.Queue)
+        self._events_lock = threading.Lock()
+        self.created_at = now_kst()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def complete(self, entry):
+        self.entry = entry
+        self.rows = len(entry['data'])
+        self.stages = {name: 'done' for name in pipeline.stages}
+        self.status = 'done'
+        self.finished_at = now_kst()
+
+    def fail(self, error):
+        self.error = error
+        self.status = 'failed'
+        self.finished_at = now_kst()
+
+    def publish(self, event):
+        with self._events_lock:
+            self.events.append(event)
+            listeners = list(self._listeners)
+        for loop, queue in listeners:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # 이미 닫힌 루프 (스트림 연결 종료)
+                pass
+
+    def publish_done(self):
+        """끝난 작업의 done 이벤트. 실패한 작업은 이번 계산의 기준 시각이 없으므로 as_of=None, partial=True"""
+        done = self.status == 'done'
+        self.publish({
+            'type': 'done',
+            'as_of': _isoformat(self.entry['computed_at']) if done else None,
+            'partial': not done,
+            'stale': self.stale,
+            'refresh_job_id': self.refresh_job,
+            'timings': self.entry.get('timings') if done else self.timings,
+        })
+
+    async def follow(self):
+        """지금까지의 이벤트부터 done까지 차례로 내보냅니다. 호출한 이벤트 루프에서 기다립니다."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        listener = (loop, queue)
+        with self._events_lock:
+            for event in self.events:
+                queue.put_nowait(event)
+            self._listeners.append(listener)
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event['type'] == 'done':
+                    return
+        finally:
+            with self._events_lock:
+                self._listeners.remove(listener)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'condition_name': self.condition_name,
+            'status': self.status,
+            'progress': {
+                # 조건검색 + 파이프라인 단계
+                'done': (self.rows is not None) + len(self.stages),
+                'total': len(pipeline.stages) + 1,
+                'rows': self.rows,
+                'stages': dict(self.stages),
+            },
+            'error': self.error,
+            'stale': self.stale,
+            'refresh_job_id': self.refresh_job,
+            'as_of': _isoformat(self.entry['computed_at']) if self.entry else None,
+            'created_at': _isoformat(self.created_at),
+            'started_at': _isoformat(self.started_at),
+            'finished_at': _isoformat(self.finished_at),
+        }
+
+
+class JobManager:
+    """
+    POST /filter 스크리닝 작업 큐.
+
+    - 작업은 워커 스레드에서 각자의 이벤트 루프로 실행되므로, 스크리닝 안의 동기 I/O / CPU 작업이
+      API 서버의 이벤트 루프를 막지 않습니다.
+    - 캐시(ScreenCache.lookup)에 결과가 있으면 바로 끝난 작업을 반환하고,
+      만료된 결과면 그대로 반환하면서 백그라운드 갱신 작업을 큐에 올립니다 (refresh_job_id).
+    - 같은 조건식의 대기 / 실행 중 작업이 있으면 새로 만들지 않고 그 작업을 공유합니다.
+    - POST /filter(상태 조회)와 POST /filter/stream(ScreenJob.follow)이 모두 이 큐로 실행됩니다.
+    - 끝난 작업은 ttl초 동안 보관합니다.
+    """
+
+    def __init__(self, cache, compute=stream_minervini, max_workers=screen_workers, ttl=job_result_ttl):
+        self.cache = cache
+        self.compute = compute
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='screen')
+        return self._executor
+
+    def _prune(self):
+        now = now_kst()
+        self._jobs = {
+            job_id: job for job_id, job in self._jobs.items()
+            if not job.finished or (now - job.finished_at).total_seconds() <= self.ttl
+        }
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def _enqueue(self, condition_name):
+        # self._lock 안에서 호출. 같은 조건식의 대기 / 실행 중 작업이 있으면 그 작업을 반환
+        job = self._active.get(condition_name)
+        if job is None:
+            job = ScreenJob(condition_name)
+            self._jobs[job.id] = job
+            self._active[condition_name] = job
+            self._pool().submit(self._work, job)
+        return job
+
+    def submit(self, condition_name, refresh=False):
+        """작업을 큐에 올리고 ScreenJob을 바로 반환합니다."""
+        with self._lock:
+            self._prune()
+            entry, stale = (None, False) if refresh else self.cache.lookup(condition_name)
+            if entry is None:
+                metrics.inc('cache_misses_total', cache='screen')
+                return self._enqueue(condition_name)
+
+            metrics.inc('cache_hits_total', cache='screen')
+            job = ScreenJob(condition_name)
+            self._jobs[job.id] = job
+            job.complete(entry)
+            if stale:
+                logger.info(f"{condition_name} 캐시 만료, 기존 결과 반환 후 백그라운드 갱신")
+                job.stale = True
+                job.refresh_job = self._enqueue(condition_name).id
+            job.publish({'type': 'rows', 'data': entry['data']})
+            job.publish_done()
+            return job
+
+    def _work(self, job):
+        try:
+            asyncio.run(self._screen(job))
+        except Exception as e:
+            logger.opt(exception=e).error(f"스크리닝 작업 {job.id} 실패: {e}")
+            job.fail(str(e))
+            job.publish({'type': 'error', 'stage': None, 'message': str(e)})
+        finally:
+            with self._lock:
+                if self._active.get(job.condition_name) is job:
+                    del self._active[job.condition_name]
+            job.publish_done()
+            metrics.inc('screen_jobs_total', status=job.status)
+            if job.started_at is not None:
+                metrics.observe('screen_job_seconds', (job.finished_at - job.started_at).total_seconds())
+
+    async def _screen(self, job):
+        job.status = 'running'
+        job.started_at = now_kst()
+        logger.info(f"스크리닝 작업 {job.id} 시작: {job.condition_name}")
+
+        # 실패한 단계가 있어도 나머지 단계 결과는 끝까지 내보내고, 결과는 캐시하지 않습니다.
+        base, results, failed = None, {}, []
+        with collect_timings() as timings:
+            try:
+                async for stage, result in self.compute(job.condition_name):
+                    if stage == 'rows':
+                        base = result
+                        job.rows = len(result)
+                        job.publish({'type': 'rows', 'data': result})
+                    elif isinstance(result, Exception):
+                        job.stages[stage] = 'failed'
+                        failed.append(stage)
+                        job.publish({'type': 'error', 'stage': stage, 'message': str(result)})
+                    else:
+                        results[stage] = result
+                        job.stages[stage] = 'done'
+                        if pipeline.stages[stage].columns:
+                            # 붙일 컬럼이 없는 중간 산출물 (예: 공유 시세)은 내보내지 않음
+                            job.publish({'type': 'patch', 'stage': stage, 'data': result})
+            finally:
+                job.timings = timings.summary()
+
+        if failed:
+            job.fail(f"{', '.join(failed)} 단계 실패")
+            logger.error(f"스크리닝 작업 {job.id} 실패: {job.error}")
+            return
+        df = pipeline.merge(base, results)
+        job.complete(self.cache.put(job.condition_name, df, job.timings))
+        logger.info(f"스크리닝 작업 {job.id} 완료: {job.rows}종목")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,8 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.templating import Jinja2Templates
-from app.routes import filter
+from loguru import logger
+from app.routes import filter, metrics
+from core.token_manager import token_provider
+from core.condition_session import condition_session
+from config import realtime_condition
 
-app = FastAPI()
+
+async def warm_up_token():
+    try:
+        await token_provider.get_token_async()
+    except Exception as e:
+        logger.warning(f"시작 시 토큰 발급 실패: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # 첫 요청이 토큰 발급을 기다리지 않도록 미리 발급
+    asyncio.create_task(warm_up_token())
+    # 실시간 조건검색 세션 (연결 유지 / 재연결은 세션이 담당)
+    if realtime_condition:
+        await condition_session.start()
+    yield
+    await condition_session.stop()
+    filter.job_manager.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(filter.router)
+app.include_router(metrics.router)
 
 templates = Jinja2Templates(directory="app/templates")
@@ -1,10 +1,25 @@
+import asyncio
+import json
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from strategies.minervini import run_minervini
+from app.screen_cache import ScreenCache
+from app.jobs import JobManager
+from config import condition_name
 
 templates = Jinja2Templates(directory="app/templates")
 router = APIRouter()
+screen_cache = ScreenCache()
+job_manager = JobManager(screen_cache)
+
+
+def to_records(df):
+    df = df.replace([float("inf"), float("-inf")], None).fillna(value=0)
+    return df.to_dict(orient="records")
+
+
+def ndjson(message):
+    return json.dumps(message, ensure_ascii=False, default=str) + "\n"
 
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -12,11 +27,66 @@ async def index(request: Request):
     
 
 @router.post("/filter")
-async def filter_stocks():
-    try:
-        df = await run_minervini()
-        df = df.replace([float("inf"), float("-inf")], None).fillna(value=0)
-        result = df.to_dict(orient="records")
-        return JSONResponse(content={"status": "success", "data": result})
-    except Exception as e:
-        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
\ No newline at end of file
+async def filter_stocks(refresh: bool = False):
+    """
+    스크리닝 작업을 큐에 올리고 바로 작업 상태를 반환합니다 (202).
+    진행 상황은 GET /jobs/{job_id}, 결과는 GET /jobs/{job_id}/result
+    캐시 결과가 있으면 끝난 작업을 반환하고, 만료된 결과면 stale과 갱신 작업 refresh_job_id를 함께 반환합니다.
+    """
+    job = job_manager.submit(condition_name, refresh=refresh)
+    return JSONResponse(content=job.to_dict(), status_code=202)
+
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": "작업을 찾을 수 없습니다."}, status_code=404)
+    return JSONResponse(content=job.to_dict())
+
+
+@router.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """끝난 작업은 결과, 진행 중인 작업은 상태(202), 실패한 작업은 오류(500)를 반환합니다."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": "작업을 찾을 수 없습니다."}, status_code=404)
+    if job.status == 'failed':
+        return JSONResponse(content={"status": "error", "message": job.error}, status_code=500)
+    if job.status != 'done':
+        return JSONResponse(content=job.to_dict(), status_code=202)
+
+    entry = job.entry
+    # 큰 결과의 직렬화도 이벤트 루프 밖에서
+    result = await asyncio.to_thread(to_records, entry['data'].copy())
+    return JSONResponse(content={
+        "status": "success",
+        "data": result,
+        "as_of": entry['computed_at'].isoformat(),
+        "timings": entry.get('timings')
+    })
+
+
+@router.post("/filter/stream")
+async def filter_stocks_stream(refresh: bool = False):
+    """
+    NDJSON 스트림. POST /filter와 같은 작업 큐로 실행하고 작업의 진행 이벤트를 그대로 내보냅니다.
+    (같은 조건식의 실행 중 작업이 있으면 그 작업에 합류, 만료된 캐시는 바로 보내고 갱신 작업을 한 번만 큐에 올림)
+
+    {"type": "rows", "data": [...]}                       조건검색 결과 (즉시)
+    {"type": "patch", "stage": "rs", "data": [...]}       단계별 추가 컬럼 (종목코드 기준)
+    {"type": "error", "stage": ..., "message": ...}
+    {"type": "done", "as_of": ..., "partial": ..., "stale": ..., "refresh_job_id": ..., "timings": ...}
+        as_of: 보낸 결과의 계산 시각 (단계가 실패한 계산은 None, partial=true)
+        timings: 단계 / 외부 호출 타이밍 요약
+    """
+    job = job_manager.submit(condition_name, refresh=refresh)
+
+    async def generate():
+        async for event in job.follow():
+            if 'data' in event:
+                # 큰 결과의 직렬화는 이벤트 루프 밖에서
+                event = {**event, "data": await asyncio.to_thread(to_records, event['data'].copy())}
+            yield ndjson(event)
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,48 @@
+# minervini/app/screen_cache.py
+import threading
+from config import filter_cache_ttl
+from utils.market_session import now_kst, trading_date, session_close
+
+
+class ScreenCache:
+    """
+    (조건식 이름, 거래일) 단위로 마지막 스크리닝 결과를 보관합니다.
+    계산은 하지 않고, 작업 큐(app/jobs.py)가 결과를 저장합니다.
+
+    - 장중: ttl이 지나면 만료 (만료된 결과도 lookup으로 꺼내 바로 응답하고 갱신은 작업 큐가 담당)
+    - 장 마감 후: 마감 이후 계산된 결과는 다음 거래일까지 고정
+    - 결과마다 계산 당시의 단계 / 외부 호출 타이밍 요약(core/metrics.py)을 함께 보관
+    - 작업 워커 스레드와 이벤트 루프가 함께 접근하므로 lock으로 보호
+    """
+
+    def __init__(self, ttl=filter_cache_ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _is_stale(self, key, entry, now):
+        day = key[1]
+        if entry['computed_at'] >= session_close(day):
+            return False
+        if now >= session_close(day):
+            return True
+        return (now - entry['computed_at']).total_seconds() > self.ttl
+
+    def lookup(self, condition_name):
+        """(오늘 거래일의 마지막 결과 또는 None, 만료 여부). ttl이 0 이하면 캐시를 쓰지 않습니다."""
+        now = now_kst()
+        key = (condition_name, trading_date(now))
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or self.ttl <= 0:
+            return None, False
+        return entry, self._is_stale(key, entry, now)
+
+    def put(self, condition_name, df, timings=None):
+        key = (condition_name, trading_date(now_kst()))
+        entry = {'data': df, 'computed_at': now_kst(), 'timings': timings}
+        with self._lock:
+            # 지난 거래일 결과는 정리
+            self._entries = {k: v for k, v in self._entries.items() if k[1] >= key[1]}
+            self._entries[key] = entry
+        return entry
@@ -9,9 +9,32 @@ from strategy import (
     VWAPIntradayStrategy2        
 )
 from brokers import get_ohlc_minervini_data, get_ohlc_pandas_data, filter_pre_market
+from config import consolidated_price_path
 
 
-def run_backtest(strategy, init_cash=1000000, commission=0.0005, plot=False):
+def add_analyzers(cerebro):
+    cerebro.addanalyzer(btanalyzers.SharpeRatio, _name='sharpe')
+    cerebro.addanalyzer(btanalyzers.Returns, _name='returns')
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+
+
+def summarize(strat):
+    """add_analyzers로 붙인 분석 결과를 dict 한 줄로 정리합니다."""
+    trades = strat.analyzers.trades.get_analysis()
+    total = trades.get('total', {})
+    return {
+        'final_value': strat.broker.getvalue(),
+        'returns': strat.analyzers.returns.get_analysis()['rtot'],
+        'sharpe': strat.analyzers.sharpe.get_analysis().get('sharperatio'),
+        'max_drawdown': strat.analyzers.drawdown.get_analysis()['max']['drawdown'],
+        'trades': total.get('total', 0),
+        'won': trades.get('won', {}).get('total', 0),
+        'lost': trades.get('lost', {}).get('total', 0),
+    }
+
+
+def run_backtest(strategy, init_cash=1000000, commission=0.0005, plot=False, precomputed=False):
     
     cerebro = bt.Cerebro()
     cerebro.broker.setcash(init_cash)
@@ -20,9 +43,9 @@ def run_backtest(strategy, init_cash=1000000, commission=0.0005, plot=False):
     data_dict = {}
     
     if strategy == 'minervini':
-        cerebro.addstrategy(MinerviniVCPStrategy)
-        data = get_ohlc_minervini_data()
-        cerebro.adddata(data)
+        cerebro.addstrategy(MinerviniVCPStrategy, precomputed=precomputed)
+        for data in get_ohlc_minervini_data(signals=precomputed, consolidated=consolidated_price_path):
+            cerebro.adddata(data)
     elif strategy in ['vwap', 'vwapbb']:
         strategy_cls = VWAPIntradayStrategy if strategy == 'vwap' else VWAPIntradayWithFilters
         cerebro.addstrategy(strategy_cls)
@@ -60,27 +83,24 @@ def run_backtest(strategy, init_cash=1000000, commission=0.0005, plot=False):
     else:
         raise ValueError(f"Unkown strategy type: {strategy}")
     
-    cerebro.addanalyzer(btanalyzers.SharpeRatio, _name='sharpe')
-    cerebro.addanalyzer(btanalyzers.Returns, _name='returns')
-    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    add_analyzers(cerebro)
     
     logger.info("백테스트 시작")
     logger.info('Starting Portfolio Value: %.2f' % cerebro.broker.getvalue())
     back = cerebro.run()
         
-    logger.info('Final Portfolio Value: %.2f' % cerebro.broker.getvalue())
-    logger.info('Total Returns: %.2f' % back[0].analyzers.returns.get_analysis()['rtot'])
-    try:
-        logger.info('Sharpe Ratio: %.2f' % back[0].analyzers.sharpe.get_analysis()['sharperatio'])
-    except:
+    summary = summarize(back[0])
+    logger.info('Final Portfolio Value: %.2f' % summary['final_value'])
+    logger.info('Total Returns: %.2f' % summary['returns'])
+    if summary['sharpe'] is not None:
+        logger.info('Sharpe Ratio: %.2f' % summary['sharpe'])
+    else:
         logger.info('Sharpe Ratio is None')
-    logger.info('Max Drawdown: %2f' % back[0].analyzers.drawdown.get_analysis()['max']['drawdown'])
+    logger.info('Max Drawdown: %2f' % summary['max_drawdown'])
     
-    trades = back[0].analyzers.trades.get_analysis()
-    logger.info(f"Total Trades: {trades.total.get('total', 0)}")
-    logger.info(f"Winning Trades: {trades.won.get('total', 0)}")
-    logger.info(f"Losing Trades: {trades.lost.get('total', 0)}")
+    logger.info(f"Total Trades: {summary['trades']}")
+    logger.info(f"Winning Trades: {summary['won']}")
+    logger.info(f"Losing Trades: {summary['lost']}")
     
     if plot and strategy in ['vwap', 'vwapbb']:
         cerebro.plot(style='candlestick')  
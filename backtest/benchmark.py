@@ -0,0 +1,350 @@
+# 실행: python benchmark.py                                 (기준치와 비교, 처리량이 떨어지거나 기준치가 없으면 종료 코드 1)
+#       python benchmark.py --sizes 10,100 --save-baseline   (현재 결과를 기준치로 저장, 저장소에 커밋)
+#
+# 네트워크 없이 합성 데이터로 backtest/strategy.py 전략의 실행 속도를 측정합니다.
+# 케이스마다 새 프로세스에서 실행해 최대 메모리(RSS)를 따로 잽니다.
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from backtest import add_analyzers
+from brokers import load_minervini_frames, make_minervini_feeds
+from strategy import MinerviniVCPStrategy, VWAPIntradayStrategy, VWAPIntradayWithFilters, VWAPIntradayStrategy2
+from vectorized import SignalMatrix, simulate
+from core.price_store import PriceStore
+from config import base_dir
+
+SIZES = [10, 100, 1000]
+
+# 종목 수(size)에 따라 데이터가 늘어나는 케이스 / 단일 피드 케이스
+SIZED_CASES = ['minervini', 'minervini_precomputed', 'minervini_vectorized', 'vwap_multi']
+SINGLE_CASES = ['vwap', 'vwapbb']
+
+bench_dir = os.path.join(base_dir, 'data', 'bench')
+# 기준치는 버전 관리 대상 (data/는 .gitignore)
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+MARKET_CODE = 'KS11'
+
+
+def krx_tick(price):
+    """유가증권시장 호가 단위"""
+    return np.select(
+        [price < 2000, price < 5000, price < 20000, price < 50000, price < 200000, price < 500000],
+        [1, 5, 10, 50, 100, 500],
+        1000,
+    )
+
+
+def _round_tick(price):
+    tick = krx_tick(price)
+    return np.maximum(np.round(price / tick) * tick, 1)
+
+
+def _bars(rng, n, start_price, vol=0.02):
+    """
+    추세 구간이 바뀌는 로그 수익률(두꺼운 꼬리) + 가격제한폭 ±30%로 만든 OHLCV.
+    반환: open, high, low, close, volume 배열
+    """
+    drift = np.repeat(rng.normal(0.0005, 0.002, n // 60 + 1), 60)[:n]
+    returns = np.clip(drift + rng.standard_t(4, n) * vol * 0.7, -0.3, 0.3)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.r_[start_price, close[:-1]] * np.exp(rng.normal(0, vol / 2, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n)))
+    # 가끔 거래량 급증
+    volume = np.round(rng.lognormal(11, 0.8, n) * np.where(rng.random(n) < 0.05, 5, 1))
+    return _round_tick(open_), _round_tick(high), _round_tick(low), _round_tick(close), volume
+
+
+def make_daily(n_tickers, years=5, seed=0, root=None):
+    """
+    결정적인 합성 일봉 저장소 (종목 n_tickers개 + 시장지수 KS11)를 만들고 경로를 반환합니다.
+    종목별 난수는 (seed, 종목 순번)으로 정해지므로 작은 유니버스는 큰 유니버스의 부분집합입니다.
+    - 일부 종목은 늦게 상장, 약 2%의 거래정지일
+    """
+    root = root or os.path.join(bench_dir, f"daily-{n_tickers}-{years}y-{seed}")
+    path = os.path.join(root, 'ohlcv.arrow')
+    if os.path.exists(path):
+        return root
+
+    dates = pd.bdate_range(end='2024-12-31', periods=years * 252)
+    n = len(dates)
+    rows = []
+    for i in range(n_tickers):
+        rng = np.random.default_rng([seed, i])
+        open_, high, low, close, volume = _bars(rng, n, rng.choice([3000, 15000, 60000, 250000]))
+        df = pd.DataFrame({'Date': dates, 'Code': f"{900000 + i:06d}", 'Open': open_, 'High': high,
+                           'Low': low, 'Close': close, 'Volume': volume})
+        if rng.random() < 0.1:
+            df = df.iloc[rng.integers(0, n // 2):]
+        rows.append(df[rng.random(len(df)) > 0.02])
+
+    rng = np.random.default_rng([seed, 1_000_000])
+    index = 2500 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, n)))
+    rows.append(pd.DataFrame({'Date': dates, 'Code': MARKET_CODE, 'Open': index, 'High': index,
+                              'Low': index, 'Close': index, 'Volume': 0.0}))
+
+    store = PriceStore(root)
+    store.write(pd.concat(rows, ignore_index=True))
+    store.consolidate(path)
+    logger.info(f"합성 일봉 생성: {root}")
+    return root
+
+
+def make_intraday(n_tickers, days=20, seed=0, root=None):
+    """
+    결정적인 합성 5분봉 (정규장 09:00~15:30, 종목 n_tickers개) Parquet 파일을 만들고 경로를 반환합니다.
+    """
+    root = root or os.path.join(bench_dir, f"intraday-{n_tickers}-{days}d-{seed}")
+    path = os.path.join(root, 'ohlcv-5m.parquet')
+    if os.path.exists(path):
+        return path
+
+    sessions = pd.bdate_range(end='2024-12-31', periods=days)
+    times = pd.timedelta_range('09:00:00', '15:30:00', freq='5min')
+    dates = (sessions.values[:, None] + times.values[None, :]).ravel()
+    rows = []
+    for i in range(n_tickers):
+        rng = np.random.default_rng([seed, i, 5])
+        open_, high, low, close, volume = _bars(rng, len(dates), rng.choice([3000, 15000, 60000]), vol=0.003)
+        rows.append(pd.DataFrame({'Date': dates, 'Code': f"{900000 + i:06d}", 'Open': open_, 'High': high,
+                                  'Low': low, 'Close': close, 'Volume': volume / 50}))
+
+    os.makedirs(root, exist_ok=True)
+    pd.concat(rows, ignore_index=True).to_parquet(path, index=False)
+    return path
+
+
+def make_hourly(days=252, seed=0, root=None):
+    """
+    VWAPIntradayStrategy용 결정적인 합성 1시간봉 (미국 정규장, UTC 시각) Parquet 파일을 만들고 경로를 반환합니다.
+    """
+    root = root or os.path.join(bench_dir, f"hourly-{days}d-{seed}")
+    path = os.path.join(root, 'ohlcv-1h.parquet')
+    if os.path.exists(path):
+        return path
+
+    sessions = pd.bdate_range(end='2024-12-31', periods=days)
+    times = pd.timedelta_range('13:30:00', '20:30:00', freq='1h')
+    dates = (sessions.values[:, None] + times.values[None, :]).ravel()
+    rng = np.random.default_rng([seed, 60])
+    open_, high, low, close, volume = _bars(rng, len(dates), 5000.0, vol=0.004)
+    df = pd.DataFrame({'Open': open_ / 1000, 'High': high / 1000, 'Low': low / 1000,
+                       'Close': close / 1000, 'Volume': volume}, index=pd.DatetimeIndex(dates, name='Date'))
+
+    os.makedirs(root, exist_ok=True)
+    df.to_parquet(path)
+    return path
+
+
+class IndicatorTimer:
+    """
+    backtrader LineIterator의 _next/_once(지표·전략)와 Strategy._oncepost(runonce 모드의 전략 next)를 감싸
+    클래스별 자기 시간(하위 지표 시간 제외)을 누적합니다. 측정 프로세스 안에서만 install 합니다.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self._stack = []
+
+    def _wrap(self, func):
+        def wrapper(obj, *args, **kwargs):
+            self._stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return func(obj, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = self._stack.pop()
+                self.totals[type(obj).__name__] += elapsed - children
+                if self._stack:
+                    self._stack[-1] += elapsed
+        return wrapper
+
+    def install(self):
+        for cls, name in [(bt.LineIterator, '_next'), (bt.LineIterator, '_once'), (bt.Strategy, '_oncepost')]:
+            setattr(cls, name, self._wrap(getattr(cls, name)))
+
+    def add(self, name, seconds):
+        self.totals[name] += seconds
+
+
+def _intraday_feeds(path):
+    frame = pd.read_parquet(path)
+    feeds = []
+    for code, df in frame.groupby('Code', sort=True):
+        df_bt = df.set_index('Date')[['Open', 'High', 'Low', 'Close', 'Volume']]
+        df_bt.columns = ['open', 'high', 'low', 'close', 'volume']
+        feeds.append(bt.feeds.PandasData(dataname=df_bt, name=code,
+                                         timeframe=bt.TimeFrame.Minutes, compression=5))
+    return feeds
+
+
+def _timed(timer, name, func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    timer.add(name, time.perf_counter() - started)
+    return result
+
+
+def run_case(case, size, path):
+    """
+    케이스 하나를 실행하고 측정값을 반환합니다 (ProcessPoolExecutor 워커에서 실행).
+    데이터 로드는 처리량에서 제외하고, 사전 계산 신호 계산(빈 임시 캐시)은 포함합니다.
+    """
+    logger.remove()
+    timer = IndicatorTimer()
+    timer.install()
+
+    load_started = time.perf_counter()
+    if case.startswith('minervini'):
+        frames = load_minervini_frames(store=PriceStore(path), market_code=MARKET_CODE,
+                                       consolidated=os.path.join(path, 'ohlcv.arrow'), min_turnover=0)
+        bars = sum(len(df) for df in frames.values())
+    elif case == 'vwap_multi':
+        feeds = _intraday_feeds(path)
+        bars = sum(len(feed.p.dataname) for feed in feeds)
+    else:
+        df = pd.read_parquet(path)
+        bars = len(df)
+    load_seconds = time.perf_counter() - load_started
+
+    with tempfile.TemporaryDirectory(prefix='bench-signals-') as cache_dir:
+        started = time.perf_counter()
+        if case == 'minervini_vectorized':
+            matrix = _timed(timer, 'signals', SignalMatrix, frames, cache_dir=cache_dir)
+            _timed(timer, 'simulate', simulate, matrix)
+        else:
+            cerebro = bt.Cerebro(stdstats=False)
+            cerebro.broker.setcash(1000000)
+            cerebro.broker.setcommission(commission=0.0005)
+            if case == 'minervini':
+                cerebro.addstrategy(MinerviniVCPStrategy)
+                feeds = make_minervini_feeds(frames)
+            elif case == 'minervini_precomputed':
+                cerebro.addstrategy(MinerviniVCPStrategy, precomputed=True)
+                feeds = _timed(timer, 'signals', make_minervini_feeds, frames, signals=True, cache_dir=cache_dir)
+            elif case == 'vwap_multi':
+                cerebro.addstrategy(VWAPIntradayStrategy2)
+            else:
+                cerebro.addstrategy(VWAPIntradayStrategy if case == 'vwap' else VWAPIntradayWithFilters)
+                feeds = [bt.feeds.PandasData(dataname=df, timeframe=bt.TimeFrame.Minutes, compression=60)]
+            for data in feeds:
+                cerebro.adddata(data)
+            add_analyzers(cerebro)
+            cerebro.run()
+        seconds = time.perf_counter() - started
+    # 지표/전략 밖의 시간 (피드 적재, 브로커, 분석기 등)
+    timer.add('other', seconds - sum(timer.totals.values()))
+
+    return {
+        'case': case,
+        'size': size,
+        'bars': bars,
+        'seconds': round(seconds, 4),
+        'bars_per_sec': round(bars / seconds, 1),
+        'load_seconds': round(load_seconds, 4),
+        # Linux ru_maxrss 단위는 KB
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'indicators': {name: round(value, 4) for name, value in sorted(timer.totals.items(), key=lambda x: -x[1])},
+    }
+
+
+def run_benchmark(cases=None, sizes=SIZES, years=5, seed=0):
+    """케이스 x 유니버스 크기별로 새 프로세스에서 run_case를 실행한 결과 목록"""
+    cases = cases or SIZED_CASES + SINGLE_CASES
+    jobs = []
+    for case in cases:
+        if case in SINGLE_CASES:
+            jobs.append((case, 1, make_hourly(seed=seed)))
+            continue
+        for size in sizes:
+            path = make_intraday(size, seed=seed) if case == 'vwap_multi' else make_daily(size, years, seed)
+            jobs.append((case, size, path))
+
+    results = []
+    for case, size, path in jobs:
+        # 케이스마다 새 프로세스 (이전 케이스의 메모리/캐시 영향 없이 최대 RSS 측정)
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context('spawn')) as executor:
+            row = executor.submit(run_case, case, size, path).result()
+        logger.info(f"{case}/{size}: {row['bars']}봉 {row['seconds']:.2f}s "
+                     f"({row['bars_per_sec']:,.0f}봉/s, 최대 RSS {row['peak_rss_mb']}MB)")
+        results.append(row)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """(기준치 대비 처리량(bars_per_sec)이 tolerance 넘게 떨어진 케이스 목록, 기준치가 없는 케이스 키 목록)"""
+    regressions, missing = [], []
+    for row in results:
+        key = f"{row['case']}/{row['size']}"
+        base = baseline.get(key)
+        if base is None:
+            missing.append(key)
+        elif row['bars_per_sec'] < base['bars_per_sec'] * (1 - tolerance):
+            regressions.append((row, base))
+    return regressions, missing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', default=None, help=f"쉼표 구분 (기본: {','.join(SIZED_CASES + SINGLE_CASES)})")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=0.2, help='허용 처리량 하락 비율')
+    parser.add_argument('--baseline', default=baseline_path)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        logger.error(f"기준치 파일 없음: {args.baseline} (--save-baseline으로 만든 뒤 커밋하세요)")
+        raise SystemExit(1)
+
+    results = run_benchmark(
+        cases=args.cases.split(',') if args.cases else None,
+        sizes=[int(size) for size in args.sizes.split(',')],
+        years=args.years,
+        seed=args.seed,
+    )
+    table = pd.DataFrame(results).set_index(['case', 'size'])
+    print(table.drop(columns='indicators').to_string())
+    for row in results:
+        top = ', '.join(f"{name} {seconds:.3f}s" for name, seconds in list(row['indicators'].items())[:6])
+        print(f"{row['case']}/{row['size']}: {top}")
+
+    os.makedirs(bench_dir, exist_ok=True)
+    with open(os.path.join(bench_dir, 'benchmark.json'), 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.update({f"{row['case']}/{row['size']}": row for row in results})
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        logger.info(f"기준치 저장: {args.baseline}")
+        raise SystemExit(0)
+
+    regressions, missing = compare(results, baseline, args.tolerance)
+    for row, base in regressions:
+        logger.error(f"처리량 하락 {row['case']}/{row['size']}: "
+                     f"{row['bars_per_sec']:,.0f}봉/s < 기준 {base['bars_per_sec']:,.0f}봉/s x {1 - args.tolerance:.2f}")
+    for key in missing:
+        logger.error(f"기준치 없음 {key}: 비교하지 못했습니다 (--save-baseline으로 추가)")
+    raise SystemExit(1 if regressions or missing else 0)
@@ -1,10 +1,16 @@
 import yfinance as yf
 import backtrader as bt
-from custom_data import CustomPandasData
+from custom_data import CustomPandasData, SignalPandasData
 import pandas as pd
 import pandas_ta as ta
+from loguru import logger
 import os
-import glob
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.price_store import PriceStore, read_consolidated
+from signals import load_signals, SIGNAL_MINPERIOD
+from config import signal_cache_dir
 
 TIMEFRAME_MAP = {
     "1m": (bt.TimeFrame.Minutes, 1),
@@ -44,32 +50,85 @@ def get_ohlc_pandas_data(market: str, timeframe: str, period: str) -> bt.feeds.P
 
     return data
 
-def get_ohlc_minervini_data(data_dir='data', market_code='KS11'):
-    # 시장지수 데이터 준비 (종가 시리즈)
-    market_df = pd.read_parquet(f'{data_dir}/{market_code}.parquet')
-    market_series = market_df['Close'].resample('D').last().fillna(method='ffill')
-
-    # 여러 종목 파일 불러오기
-    files = glob.glob(f'{data_dir}/*.parquet')
-    for file in files:
-        code = os.path.basename(file).replace('.parquet', '')
-        if code == market_code:
-            continue
-
-        df = pd.read_parquet(file)
-        
-        if len(df) < 260:
-            continue
-
-        # backtrader용 데이터셋 준비
-        df_bt = df[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
-        df_bt.columns = ['open', 'high', 'low', 'close', 'volume']
-        df_bt['market_close'] = market_series.loc[df_bt.index].values
-        df_bt['datetime'] = df.index
-        df_bt.set_index('datetime', inplace=True)
-        
-        data = CustomPandasData(dataname=df_bt, name=code)
-        return data
+def load_minervini_frames(store=None, market_code='KS11',
+                          min_history=260, min_turnover=1e9, turnover_window=60,
+                          consolidated=None, max_workers=8):
+    """
+    저장소의 전 종목을 읽어 조건을 통과한 종목별 backtrader 입력 프레임 {종목코드: DataFrame}을 반환합니다.
+
+    - min_history: 최소 봉 수
+    - min_turnover: 봉마다 직전 turnover_window일(해당 봉 포함) 평균 거래대금(종가 x 거래량) 하한.
+      미래 봉을 보지 않도록 종목을 걸러내지 않고 liquid 컬럼(1/0)으로 남겨 진입 시점에 확인합니다.
+    - consolidated: PriceStore.consolidate로 만든 Arrow 파일 경로 (있으면 메모리 매핑으로 읽음)
+    """
+    if consolidated and os.path.exists(consolidated):
+        frame = read_consolidated(consolidated)
+    else:
+        store = store or PriceStore()
+        frame = store.read_all(max_workers=max_workers)
+
+    # 시장지수 종가 (달력일 기준 직전 값으로 채움) 를 전 종목 행에 한 번에 정렬
+    is_market = frame['Code'] == market_code
+    market_series = frame[is_market].set_index('Date')['Close'].resample('D').last().ffill()
+    frame = frame[~is_market].copy()
+    frame['market_close'] = market_series.reindex(frame['Date']).to_numpy()
+
+    # 최소 이력 필터
+    counts = frame.groupby('Code').size()
+    eligible = counts.index[counts >= min_history]
+    logger.info(f"백테스트 대상: {len(eligible)} / {len(counts)}종목")
+    frame = frame[frame['Code'].isin(eligible)].copy()
+
+    # 유동성: 그 봉까지의 이력만으로 계산한 이동 평균 거래대금
+    if min_turnover > 0:
+        turnover = (frame['Close'] * frame['Volume']).groupby(frame['Code']).rolling(turnover_window).mean()
+        frame['liquid'] = (turnover.droplevel(0) >= min_turnover).astype('float64')
+    else:
+        frame['liquid'] = 1.0
+
+    frame = frame.rename(columns={
+        'Date': 'datetime', 'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Volume': 'volume'
+    })
+
+    # backtrader용 데이터셋 준비
+    return {
+        code: df.set_index('datetime')[['open', 'high', 'low', 'close', 'volume', 'market_close', 'liquid']]
+        for code, df in frame.groupby('Code', sort=True)
+    }
+
+
+def make_minervini_feeds(frames, signals=False, signal_params=None, start=None, end=None,
+                         cache_dir=signal_cache_dir):
+    """
+    load_minervini_frames 결과로 데이터 피드 목록을 만듭니다. signals=True면 사전 계산 신호 라인 포함.
+    start/end로 구간을 자르면 신호는 전체 이력으로 계산해 둔 값을 쓰므로 구간 첫 봉부터 워밍업이 끝난 상태입니다.
+    cache_dir: 신호 디스크 캐시 위치
+    """
+    if (start is not None or end is not None) and not signals:
+        raise ValueError("구간 실행(start/end)은 사전 계산 신호(signals=True)에서만 지원합니다")
+
+    datas = []
+    for code, df_bt in frames.items():
+        if signals:
+            # 전략 지표를 한 번에 계산한 신호 라인 (디스크 캐시)
+            df_bt = df_bt.join(load_signals(df_bt, code, cache_dir=cache_dir, **(signal_params or {})))
+            minperiod = SIGNAL_MINPERIOD
+            if start is not None or end is not None:
+                df_bt = df_bt.loc[start:end]
+                minperiod = 1
+                if df_bt.empty:
+                    continue
+            data = SignalPandasData(dataname=df_bt, name=code, minperiod=minperiod)
+        else:
+            data = CustomPandasData(dataname=df_bt, name=code)
+        datas.append(data)
+    return datas
+
+
+def get_ohlc_minervini_data(store=None, market_code='KS11', signals=False, **kwargs):
+    """조건을 통과한 전 종목의 데이터 피드 목록 (kwargs는 load_minervini_frames 참고)"""
+    frames = load_minervini_frames(store=store, market_code=market_code, **kwargs)
+    return make_minervini_feeds(frames, signals=signals)
     
 def filter_pre_market(ticker):
     data_source = yf.Ticker(ticker)
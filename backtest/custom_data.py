@@ -1,8 +1,9 @@
 import backtrader as bt
+import numpy as np
 
 
 class CustomPandasData(bt.feeds.PandasData):
-    lines = ('market_close',)
+    lines = ('market_close', 'liquid')
     params = (
         ('datetime', None),         
         ('open', -1),
@@ -12,6 +13,46 @@ class CustomPandasData(bt.feeds.PandasData):
         ('volume', -1),
         ('openinterest', None),
         ('market_close', -1),       
+        ('liquid', -1),             # 진입 시점 유동성 조건 (brokers.load_minervini_frames)
     )
-    
-    
\ No newline at end of file
+
+    def start(self):
+        super().start()
+        # 봉마다 DataFrame.iloc로 셀을 읽으면 (특히 arrow 컬럼에서) 적재가 백테스트 시간의 대부분을 차지하므로
+        # 라인별 값과 날짜 숫자를 시작할 때 한 번에 꺼내 둡니다.
+        df = self.p.dataname
+        self._columns = [
+            (getattr(self.lines, field), df.iloc[:, col].to_numpy(dtype='float64', na_value=np.nan).tolist())
+            for field in self.getlinealiases()
+            if field != 'datetime' and (col := self._colmapping[field]) is not None
+        ]
+        coldtime = self._colmapping['datetime']
+        stamps = df.index if coldtime is None else df.iloc[:, coldtime]
+        self._dtnums = [bt.date2num(ts.to_pydatetime()) for ts in stamps]
+
+    def _load(self):
+        self._idx += 1
+        if self._idx >= len(self._dtnums):
+            return False
+
+        for line, values in self._columns:
+            line[0] = values[self._idx]
+        self.lines.datetime[0] = self._dtnums[self._idx]
+        return True
+
+
+class SignalPandasData(CustomPandasData):
+    """CustomPandasData + 미리 계산한 전략 신호 라인 (backtest/signals.py)"""
+    lines = ('trend', 'mansfield_rs', 'vcp', 'breakout')
+    params = (
+        ('trend', -1),
+        ('mansfield_rs', -1),
+        ('vcp', -1),
+        ('breakout', -1),
+        ('minperiod', 1),
+    )
+
+    def __init__(self):
+        super().__init__()
+        # 지표를 붙였을 때와 같은 봉부터 전략 next가 시작되도록 최소 기간을 데이터에 둡니다.
+        self._minperiod = self.p.minperiod
@@ -1,12 +1,107 @@
 import backtrader as bt
-import numpy as np
-from scipy.stats import linregress
 from scipy.signal import find_peaks
 import datetime
+import math
+from collections import deque
 from typing import Optional
 import pytz
 
 
+class RollingExtreme:
+    """최근 period개 값의 최댓값(mode=max) 또는 최솟값(mode=min)을 단조 덱으로 유지 (push 상각 O(1))"""
+
+    def __init__(self, period, mode=max):
+        self.period = period
+        self.mode = mode
+        self._items = deque()  # (순번, 값), 값이 단조 감소(max) / 증가(min)
+        self._count = 0
+
+    def push(self, value):
+        while self._items and self.mode(self._items[-1][1], value) == value:
+            self._items.pop()
+        self._items.append((self._count, value))
+        self._count += 1
+        if self._items[0][0] <= self._count - 1 - self.period:
+            self._items.popleft()
+
+    @property
+    def value(self):
+        return self._items[0][1] if self._items else float('nan')
+
+
+class RollingSum:
+    """최근 period개 값의 합. 누적 합으로 갱신하고 period번마다 다시 합산해 오차 누적을 막습니다."""
+
+    def __init__(self, period):
+        self.period = period
+        self._values = deque(maxlen=period)
+        self._sum = 0.0
+        self._stale = 0
+
+    def push(self, value):
+        old = self._values[0] if len(self._values) == self.period else 0.0
+        self._values.append(value)
+        self._stale += 1
+        if self._stale >= self.period:
+            self._sum = sum(self._values)
+            self._stale = 0
+        else:
+            self._sum += value - old
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def value(self):
+        return self._sum
+
+
+class RollingSlope:
+    """
+    최근 period개 값의 선형회귀 기울기 (x = 0, 1, ..., period-1).
+    Σy, Σx·y를 누적 갱신하고 period번마다 다시 합산합니다. 창이 덜 찼거나 NaN이 있으면 NaN.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self._values = deque(maxlen=period)
+        self._sum = 0.0
+        self._xsum = 0.0
+        self._nans = 0
+        self._stale = 0
+        self._x_mean = (period - 1) / 2
+        self._ssx = period * (period ** 2 - 1) / 12
+
+    def _recompute(self):
+        self._sum = sum(self._values)
+        self._xsum = sum(i * y for i, y in enumerate(self._values))
+        self._stale = 0
+
+    def push(self, value):
+        full = len(self._values) == self.period
+        old = self._values[0] if full else 0.0
+        self._values.append(value)
+        self._nans += math.isnan(value) - (full and math.isnan(old))
+        self._stale += 1
+        if self._nans:
+            return
+        if math.isnan(old) or self._stale >= self.period:
+            self._recompute()
+        elif full:
+            # 창이 한 칸 밀리면 기존 값들의 x가 1씩 줄어듭니다.
+            self._xsum += (self.period - 1) * value - (self._sum - old)
+            self._sum += value - old
+        else:
+            self._xsum += (len(self._values) - 1) * value
+            self._sum += value
+
+    @property
+    def value(self):
+        if len(self._values) < self.period or self._nans:
+            return float('nan')
+        return (self._xsum - self._x_mean * self._sum) / self._ssx
+
+
 class TrendTemplate(bt.Indicator):
     lines = ('check_trend',)
     
@@ -20,9 +115,26 @@ class TrendTemplate(bt.Indicator):
         self.sma200 = sma200
         self.sma150 = sma150
         self.sma50 = sma50
-        
+
+        self.max_close = RollingExtreme(200, max)
+        self.min_close = RollingExtreme(200, min)
+        self.sma200_slope = RollingSlope(20)
+        self._seen = 0
+
+    def _update(self):
+        # 봉마다 한 번만 갱신 (여러 데이터를 next 모드로 돌리면 같은 봉에서 다시 호출될 수 있음)
+        if len(self) == self._seen:
+            return
+        self._seen = len(self)
+        self.max_close.push(self.data.close[0])
+        self.min_close.push(self.data.close[0])
+        self.sma200_slope.push(self.sma200[0])
+
+    def prenext(self):
+        self._update()
+
     def next(self):
-        
+        self._update()
         close = self.data.close[0]
         sma200 = self.sma200[0]
         sma150 = self.sma150[0]
@@ -33,19 +145,14 @@ class TrendTemplate(bt.Indicator):
         cond3 = sma50 > sma150 and sma50 > sma200
         cond4 = close > sma50
         
-        max_close = max(self.data.close.get(size=200))
-        min_close = min(self.data.close.get(size=200))
+        max_close = self.max_close.value
+        min_close = self.min_close.value
         
         cond5 = close >= max_close * 0.75
         cond6 = close >= min_close * 1.3
         
-        sma200_array = self.sma200.get(size=20)
-        if len(sma200_array) < 20:
-            cond7 = False
-        else:
-            x = np.arange(len(sma200_array))
-            slope, _, _, _, _ = linregress(x, sma200_array)
-            cond7 = slope > 0
+        # 200일선 최근 20개 값의 회귀 기울기 (20개가 모두 유효해야 함)
+        cond7 = self.sma200_slope.value > 0
         self.lines.check_trend[0] = int(all([cond2, cond3, cond4, cond7]))
 
 
@@ -146,19 +253,35 @@ class Breakout(bt.Indicator):
     
     def __init__(self):
         self.addminperiod(22)
-        
+        self.high_close = RollingExtreme(20, max)
+        self.volume_sum = RollingSum(5)
+        self._seen = 0
+
+    def _update(self):
+        # 현재 봉을 넣기 전에 직전 봉까지의 값을 읽어 둡니다. (봉마다 한 번만 갱신)
+        if len(self) == self._seen:
+            return
+        self._seen = len(self)
+        self.recent_high = self.high_close.value
+        self.avg_vol = self.volume_sum.value / len(self.volume_sum) if len(self.volume_sum) else float('nan')
+        self.high_close.push(self.data.close[0])
+        self.volume_sum.push(self.data.volume[0])
+
+    def prenext(self):
+        self._update()
+
     def next(self):
+        self._update()
         if len(self.data) < 22:
             self.lines.breakout_signal[0] = 0
             return
 
         # 최근 20일(종료 하루 전)의 최고 종가
-        recent_high = max(self.data.close.get(size=21)[:-1])
+        recent_high = self.recent_high
         current_close = self.data.close[0]
 
         # 최근 5일 평균 거래량 (현재 제외)
-        recent_vols = self.data.volume.get(size=6)[:-1]
-        avg_vol = np.mean(recent_vols)
+        avg_vol = self.avg_vol
         current_vol = self.data.volume[0]
 
         breakout = current_close > recent_high
@@ -182,7 +305,11 @@ class VwapIntradayIndicator(bt.Indicator):
         self.hlc = (self.data.high + self.data.low + self.data.close) / 3.0
 
         self.current_date: Optional[datetime.date] = None
-        self.previous_date_index: int = -1
+
+        # 당일 누적 HLC x 거래량 / 거래량 (세션이 바뀌면 초기화)
+        self.pv_sum: float = 0
+        self.volume_sum: float = 0
+        self._seen: int = 0
 
     def next(self) -> None:
         current_date = (
@@ -192,14 +319,15 @@ class VwapIntradayIndicator(bt.Indicator):
 
         if self.current_date != current_date:
             self.current_date = current_date
-            self.previous_date_index = len_self - 1
+            self.pv_sum = 0
+            self.volume_sum = 0
 
-        volumes = self.data.volume.get(size=len_self - self.previous_date_index)
-        hlc = self.hlc.get(size=len_self - self.previous_date_index)
+        if len_self != self._seen:
+            self._seen = len_self
+            self.pv_sum += self.hlc[0] * self.data.volume[0]
+            self.volume_sum += self.data.volume[0]
 
-        numerator = sum(hlc[i] * volumes[i] for i in range(len(volumes)))
-        
-        vwap_value = numerator / sum(volumes) if sum(volumes) else self.lines.vwap_intraday[-1]
+        vwap_value = self.pv_sum / self.volume_sum if self.volume_sum else self.lines.vwap_intraday[-1]
         self.lines.vwap_intraday[0] = vwap_value
 
 class VwapIntradayIndicator2(bt.Indicator):
@@ -0,0 +1,174 @@
+# 실행: python optimize.py --grid stop_loss=0.03,0.05,0.08 trailing_stop_pct=0.1,0.15 --workers 8
+#       python optimize.py --random 500 --workers 8
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import backtrader as bt
+import pandas as pd
+from loguru import logger
+
+from backtest import add_analyzers, summarize
+from brokers import load_minervini_frames, make_minervini_feeds
+from signals import DEFAULT_PARAMS
+from strategy import MinerviniVCPStrategy
+from vectorized import run_vectorized
+from config import base_dir, consolidated_price_path, signal_cache_dir
+
+# 값 목록은 그중 하나, (하한, 상한) 튜플은 균등분포 (랜덤 탐색)
+SEARCH_SPACE = {
+    'stop_loss': [0.03, 0.05, 0.07, 0.1],
+    'trailing_stop_pct': [0.05, 0.1, 0.15, 0.2],
+    'mansfield_threshold': [0, 4, 8, 12],
+    'vol_shrink_thresh': (0.6, 1.0),
+    'volume_shrink_thresh': (0.5, 0.9),
+    'volume_multiplier': (1.2, 2.5),
+}
+
+RESULT_COLUMNS = ['final_value', 'returns', 'sharpe', 'max_drawdown', 'trades', 'won', 'lost']
+
+# 워커 프로세스가 공유하는 읽기 전용 입력 프레임 {종목코드: DataFrame}
+_frames = None
+
+
+def grid(space):
+    """{파라미터: 값 목록} -> 모든 조합"""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_search(space, n, seed=0):
+    rng = random.Random(seed)
+    combos = []
+    for _ in range(n):
+        combo = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                combo[key] = round(rng.uniform(*values), 4)
+            else:
+                combo[key] = rng.choice(values)
+        combos.append(combo)
+    return combos
+
+
+def _init_worker(frames, loader_kwargs):
+    global _frames
+    # fork로 시작하면 부모가 읽어 둔 프레임을 그대로 공유 (copy-on-write), 아니면 워커마다 한 번만 로드
+    _frames = frames if frames is not None else load_minervini_frames(**loader_kwargs)
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+
+def run_one(params, precomputed=True, init_cash=1000000, commission=0.0005, frames=None,
+            start=None, end=None, daily_returns=False, engine='backtrader', cache_dir=signal_cache_dir):
+    """
+    파라미터 조합 하나로 Cerebro를 실행하고 summarize 결과를 반환합니다.
+    start/end: 실행 구간 (사전 계산 신호 필요), daily_returns: 일별 수익률(TimeReturn)을 'daily_returns'로 포함
+    engine: 'vectorized'면 backtrader 대신 벡터화 엔진 (vectorized.py, 항상 사전 계산 신호)
+    cache_dir: 사전 계산 신호 디스크 캐시 위치
+    """
+    frames = frames if frames is not None else _frames
+    if engine == 'vectorized':
+        return run_vectorized(params, frames, init_cash, commission, start=start, end=end, daily_returns=daily_returns,
+                              cache_dir=cache_dir)
+
+    signal_params = {k: v for k, v in params.items() if k in DEFAULT_PARAMS}
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.broker.setcash(init_cash)
+    cerebro.broker.setcommission(commission=commission)
+    cerebro.addstrategy(MinerviniVCPStrategy, precomputed=precomputed, **params)
+    for data in make_minervini_feeds(frames, signals=precomputed, signal_params=signal_params, start=start, end=end,
+                                     cache_dir=cache_dir):
+        cerebro.adddata(data)
+    add_analyzers(cerebro)
+    if daily_returns:
+        cerebro.addanalyzer(bt.analyzers.TimeReturn, _name='time_return', timeframe=bt.TimeFrame.Days)
+
+    strat = cerebro.run()[0]
+    row = {**params, **summarize(strat)}
+    if daily_returns:
+        row['daily_returns'] = dict(strat.analyzers.time_return.get_analysis())
+    return row
+
+
+def make_pool(max_workers=None, frames=None, **loader_kwargs):
+    """
+    입력 프레임을 부모에서 한 번 읽어 공유하는 프로세스 풀 (fork 불가 환경에서는 워커마다 한 번 로드).
+    frames: 이미 읽어 둔 load_minervini_frames 결과
+    """
+    loader_kwargs.setdefault('consolidated', consolidated_price_path)
+    context = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+    if context.get_start_method() != 'fork':
+        frames = None
+    elif frames is None:
+        frames = load_minervini_frames(**loader_kwargs)
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                               initializer=_init_worker, initargs=(frames, loader_kwargs))
+
+
+def sweep(combos, max_workers=None, precomputed=True, out_path=None, engine='backtrader', **loader_kwargs):
+    """
+    파라미터 조합을 프로세스 풀에 나눠 실행하고, 끝나는 대로 결과를 out_path(CSV)에 한 줄씩 기록합니다.
+    입력 데이터는 부모 프로세스에서 한 번만 읽어 워커가 공유합니다.
+    반환: Sharpe 내림차순 결과 테이블
+    """
+    out_path = out_path or os.path.join(base_dir, 'data', 'sweep.csv')
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+    rows = []
+    with open(out_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(combos[0]) + RESULT_COLUMNS if combos else RESULT_COLUMNS)
+        writer.writeheader()
+        with make_pool(max_workers, **loader_kwargs) as executor:
+            futures = {executor.submit(run_one, combo, precomputed, engine=engine): combo for combo in combos}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    logger.error(f"{futures[future]} 실행 실패: {e}")
+                    continue
+                writer.writerow(row)
+                f.flush()
+                rows.append(row)
+                logger.info(f"[{done}/{len(combos)}] sharpe={row['sharpe']} returns={row['returns']:.4f} {futures[future]}")
+
+    return pd.DataFrame(rows).sort_values('sharpe', ascending=False, na_position='last').reset_index(drop=True)
+
+
+def parse_grid(items):
+    # stop_loss=0.03,0.05 -> {'stop_loss': [0.03, 0.05]}
+    space = {}
+    for item in items:
+        key, values = item.split('=')
+        space[key] = [float(v) for v in values.split(',')]
+    return space
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--grid', nargs='*', help='param=v1,v2,... (없으면 SEARCH_SPACE의 목록형 파라미터)')
+    parser.add_argument('--random', type=int, default=0, help='랜덤 탐색 횟수 (SEARCH_SPACE 사용)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--indicators', action='store_true', help='사전 계산 신호 대신 backtrader 지표 사용')
+    parser.add_argument('--engine', default='backtrader', choices=['backtrader', 'vectorized'])
+    parser.add_argument('--out', default=None)
+    args = parser.parse_args()
+
+    if args.random:
+        combos = random_search(SEARCH_SPACE, args.random, seed=args.seed)
+    elif args.grid:
+        combos = grid(parse_grid(args.grid))
+    else:
+        combos = grid({k: v for k, v in SEARCH_SPACE.items() if isinstance(v, list)})
+
+    logger.info(f"파라미터 조합: {len(combos)}개")
+    results = sweep(combos, max_workers=args.workers, precomputed=not args.indicators, out_path=args.out,
+                    engine=args.engine)
+    print(results.head(20).to_string())
@@ -0,0 +1,229 @@
+import contextlib
+import glob
+import hashlib
+import itertools
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import signal_cache_dir
+
+SIGNALS = ['trend', 'mansfield_rs', 'vcp', 'breakout']
+# 신호 계산에 쓰는 입력 컬럼 (캐시 키의 데이터 지문도 이 컬럼만 봅니다)
+INPUT_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'market_close']
+SIGNAL_VERSION = 2
+
+# TrendTemplate(200) / MansfieldRS(52) / VCP(21) / Breakout(22) 중 가장 긴 최소 기간
+SIGNAL_MINPERIOD = 200
+
+DEFAULT_PARAMS = dict(
+    ma_length=52,
+    vol_lookback_short=5,
+    vol_lookback_long=20,
+    volume_lookback_short=5,
+    volume_lookback_long=20,
+    breakout_lookback=20,
+    vol_shrink_thresh=0.8,
+    volume_shrink_thresh=0.7,
+    volume_multiplier=1.5,
+)
+
+# 임계값 파라미터는 캐시한 원시 시계열에 로드할 때마다 적용하므로 캐시 키에서 제외합니다.
+THRESHOLD_PARAMS = ['vol_shrink_thresh', 'volume_shrink_thresh', 'volume_multiplier']
+SERIES_PARAMS = [k for k in DEFAULT_PARAMS if k not in THRESHOLD_PARAMS]
+
+
+def _window_sums(values, period):
+    """
+    창마다 math.fsum과 같은 (정확한 합을 한 번만 반올림한) 합.
+    모든 값은 공통 단위 2^base의 정수배이므로 정수 누적합의 차이가 창 합과 정확히 같고, 창 길이와 무관하게 O(n)입니다.
+    정수 누적합이 int64에 들어가면(종가 / 거래량 등) NumPy로, 아니면(RS 비율 등) 파이썬 정수로 계산합니다.
+    """
+    finite = np.isfinite(values)
+    clean = np.where(finite, values, 0.0)
+    mantissa, exponent = np.frexp(clean)
+    ints = (mantissa * 2.0 ** 53).astype(np.int64)  # 값 = ints x 2^(exponent - 53), 정확
+    nonzero = ints != 0
+    if nonzero.any():
+        # 값마다 최하위 1비트의 자리 중 가장 낮은 것이 공통 단위
+        lowbit = np.frexp((ints & -ints)[nonzero].astype('float64'))[1] - 1
+        base = int((exponent[nonzero] - 53 + lowbit).min())
+        top = int(exponent[nonzero].max())
+    else:
+        base = top = 0
+
+    if top - base + len(values).bit_length() <= 62:
+        cum = np.concatenate([[0], np.cumsum(np.ldexp(clean, -base).astype(np.int64))])
+        # int64 -> float64 변환은 최근접 짝수 반올림 한 번, 2^base 곱은 정확
+        sums = np.ldexp((cum[period:] - cum[:-period]).astype('float64'), base)
+    else:
+        shifts = (exponent - 53 - base).tolist()
+        cum = [0, *itertools.accumulate(m << s if s >= 0 else m >> -s for m, s in zip(ints.tolist(), shifts))]
+        if base >= 0:
+            sums = np.array([float((b - a) << base) for a, b in zip(cum, cum[period:])])
+        else:
+            unit = 1 << -base
+            # 정수끼리의 나눗셈은 올바르게 반올림된 float
+            sums = np.array([(b - a) / unit for a, b in zip(cum, cum[period:])])
+
+    # NaN / inf가 낀 창은 fsum 그대로 (NaN 전파)
+    if not finite.all():
+        count = np.concatenate([[0], np.cumsum(~finite)])
+        items = values.tolist()
+        for i in np.flatnonzero(count[period:] - count[:-period]).tolist():
+            sums[i] = math.fsum(items[i:i + period])
+    return sums
+
+
+def _sma(values, period):
+    # backtrader SMA(Average: math.fsum(창) / period)와 비트 단위로 같아야 합니다.
+    # rolling().mean()은 정수가 아닌 입력(RS 비율 등)에서 마지막 자리가 달라져 지표 실행과의 패리티가 깨집니다.
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = _window_sums(values, period) / period
+    return out
+
+
+def _shift(values, n):
+    # backtrader data(-n)
+    return np.concatenate([np.full(n, np.nan), values[:-n]]) if n else values
+
+
+def _stddev(values, period):
+    # bt.ind.StdDev: sqrt(mean(x^2) - mean(x)^2)
+    with np.errstate(invalid='ignore'):
+        return np.power(_sma(values ** 2, period) - _sma(values, period) ** 2, 0.5)
+
+
+def _highest(values, period):
+    return pd.Series(values).rolling(period).max().to_numpy()
+
+
+def compute_series(df, **params):
+    """
+    MinerviniVCPStrategy 지표 중 창 길이(SERIES_PARAMS)에만 의존하는 시계열을 종목 전체 구간에 한 번에 계산합니다.
+    df: open/high/low/close/volume/market_close 컬럼 (CustomPandasData 입력과 동일)
+    각 지표의 최소 기간 이전 봉은 TrendTemplate / MansfieldRS는 0, 나머지는 NaN (비교가 항상 거짓)
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    close = df['close'].to_numpy(dtype='float64')
+    volume = df['volume'].to_numpy(dtype='float64')
+    market = df['market_close'].to_numpy(dtype='float64')
+    n = len(close)
+    index = np.arange(n)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # TrendTemplate: 150일선 > 200일선, 50일선 > 150/200일선, 종가 > 50일선, 200일선 최근 20개 회귀 기울기 > 0
+        sma50, sma150, sma200 = _sma(close, 50), _sma(close, 150), _sma(close, 200)
+        slope = np.full(n, np.nan)
+        if n >= 20:
+            slope[19:] = sliding_window_view(sma200, 20) @ (np.arange(20) - 9.5)
+        trend = (sma150 > sma200) & (sma50 > sma150) & (sma50 > sma200) & (close > sma50) & (slope > 0)
+        trend &= index >= 199
+
+        # MansfieldRS
+        ratio = close / market * 100
+        mansfield = (ratio / _sma(ratio, p['ma_length']) - 1) * 100
+        mansfield[index < p['ma_length'] - 1] = 0
+
+        # VCP: 변동성 / 평균 거래량의 최근 구간과 직전 구간, 직전 고점
+        short, long = p['vol_lookback_short'], p['vol_lookback_long']
+        vshort, vlong = p['volume_lookback_short'], p['volume_lookback_long']
+        vcp = pd.DataFrame({
+            'vol_now': _stddev(close, short),
+            'vol_prev': _stddev(_shift(close, short), long - short),
+            'vol_avg_now': _sma(volume, vshort),
+            'vol_avg_prev': _sma(_shift(volume, vshort), vlong - vshort),
+            'highest': _highest(_shift(close, 1), p['breakout_lookback']),
+        })
+        vcp.loc[index < max(long, p['breakout_lookback'] + 1) - 1, :] = np.nan
+
+        # Breakout: 최근 20일(현재 제외) 최고 종가 / 직전 5일 평균 거래량
+        recent_high = _highest(_shift(close, 1), 20)
+        avg_vol = np.full(n, np.nan)
+        if n >= 6:
+            avg_vol[5:] = sliding_window_view(volume[:-1], 5).sum(axis=1) / 5
+        recent_high = np.where(index >= 21, recent_high, np.nan)
+
+    series = pd.DataFrame({
+        'trend': trend.astype('float64'),
+        'mansfield_rs': np.nan_to_num(mansfield, nan=0.0),
+        **{column: values.to_numpy() for column, values in vcp.items()},
+        'recent_high': recent_high,
+        'avg_vol': avg_vol,
+    }, index=df.index)
+    return series
+
+
+def apply_thresholds(df, series, **params):
+    """compute_series 결과에 임계값(THRESHOLD_PARAMS)을 적용해 SIGNALS 컬럼(0/1, MansfieldRS 값)을 만듭니다."""
+    p = {**DEFAULT_PARAMS, **params}
+    close = df['close'].to_numpy(dtype='float64')
+    volume = df['volume'].to_numpy(dtype='float64')
+    s = {column: values.to_numpy() for column, values in series.items()}
+
+    with np.errstate(invalid='ignore'):
+        vcp = (
+            (s['vol_now'] < s['vol_prev'] * p['vol_shrink_thresh'])
+            & (s['vol_avg_now'] < s['vol_avg_prev'] * p['volume_shrink_thresh'])
+            & (close > s['highest'])
+        )
+        breakout = (close > s['recent_high']) & (volume > s['avg_vol'] * p['volume_multiplier'])
+
+    return pd.DataFrame({
+        'trend': s['trend'],
+        'mansfield_rs': s['mansfield_rs'],
+        'vcp': vcp.astype('float64'),
+        'breakout': breakout.astype('float64'),
+    }, index=df.index)
+
+
+def compute_signals(df, **params):
+    """
+    MinerviniVCPStrategy의 지표(TrendTemplate, MansfieldRS, VCP, Breakout)를 종목 전체 구간에 한 번에 계산합니다.
+    각 지표의 최소 기간 이전 봉은 0
+    """
+    return apply_thresholds(df, compute_series(df, **params), **params)
+
+
+def params_hash(**params):
+    # 캐시 키는 창 길이 파라미터만 (임계값은 로드할 때 적용)
+    p = {**DEFAULT_PARAMS, **params}
+    key = json.dumps({k: p[k] for k in SERIES_PARAMS}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def data_hash(df):
+    # 입력 데이터 내용(인덱스 포함) 지문: 저장소가 갱신되면 키가 바뀝니다.
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()[:12]
+
+
+def load_signals(df, name, cache_dir=signal_cache_dir, **params):
+    """
+    compute_signals와 같은 결과를 반환합니다.
+    창 길이에만 의존하는 compute_series 결과를 (종목, 버전, 데이터 지문, 창 길이 해시) 단위로 디스크에 캐시하고,
+    임계값은 매번 메모리에서 적용하므로 임계값만 다른 파라미터 조합은 캐시를 공유합니다.
+    """
+    prefix = f"{name}-v{SIGNAL_VERSION}-{data_hash(df[INPUT_COLUMNS])}-"
+    path = os.path.join(cache_dir, f"{prefix}{params_hash(**params)}.parquet")
+    if os.path.exists(path):
+        return apply_thresholds(df, pd.read_parquet(path), **params)
+
+    series = compute_series(df, **params)
+    os.makedirs(cache_dir, exist_ok=True)
+    # 같은 종목의 이전 버전 / 이전 데이터 캐시는 정리 (현재 데이터의 다른 창 길이 캐시는 유지)
+    # (스윕 워커가 동시에 같은 키를 쓸 수 있으므로 이미 지워진 파일은 무시)
+    for old in glob.glob(os.path.join(cache_dir, f"{name}-*.parquet")):
+        if not os.path.basename(old).startswith(prefix):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(old)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    series.to_parquet(tmp)
+    os.replace(tmp, path)
+    return apply_thresholds(df, series, **params)
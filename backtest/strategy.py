@@ -19,7 +19,11 @@ class MinerviniVCPStrategy(bt.Strategy):
         stop_loss=0.05,
         # take_profit=0.1,
         trailing_stop_pct=0.1,
-        mansfield_threshold=8
+        mansfield_threshold=8,
+        vol_shrink_thresh=0.8,      # VCP 변동성 수축 기준
+        volume_shrink_thresh=0.7,   # VCP 거래량 감소 기준
+        volume_multiplier=1.5,      # Breakout 거래량 급증 배수
+        precomputed=False  # True: SignalPandasData의 사전 계산 신호 라인 사용 (위 지표 파라미터는 신호 계산 시 적용)
     )
 
     def __init__(self):
@@ -28,10 +32,19 @@ class MinerviniVCPStrategy(bt.Strategy):
         self.signal_flag = [False] * len(self.datas)
         self.highest_price = [0.0] * len(self.datas)
         
-        self.trend = [TrendTemplate(d) for d in self.datas]
-        self.mansfield_rs = [MansfieldRS(d) for d in self.datas]
-        self.vcp = [VCP(d) for d in self.datas]
-        self.breakout = [Breakout(d) for d in self.datas]
+        if self.p.precomputed:
+            self.trend = [d.trend for d in self.datas]
+            self.mansfield_rs = [d.mansfield_rs for d in self.datas]
+            self.vcp = [d.vcp for d in self.datas]
+            self.breakout = [d.breakout for d in self.datas]
+        else:
+            self.trend = [TrendTemplate(d) for d in self.datas]
+            self.mansfield_rs = [MansfieldRS(d) for d in self.datas]
+            self.vcp = [
+                VCP(d, vol_shrink_thresh=self.p.vol_shrink_thresh, volume_shrink_thresh=self.p.volume_shrink_thresh)
+                for d in self.datas
+            ]
+            self.breakout = [Breakout(d, volume_multiplier=self.p.volume_multiplier) for d in self.datas]
 
     def log(self, txt, data=None):
         if data:
@@ -69,6 +82,7 @@ class MinerviniVCPStrategy(bt.Strategy):
                 continue
             if not self.getposition(d).size: 
                 if (
+                    d.liquid[0] and
                     self.trend[i][0] and
                     self.mansfield_rs[i][0] >= self.p.mansfield_threshold and
                     self.vcp[i][0] and
@@ -0,0 +1,322 @@
+# 실행: python vectorized.py --stop-loss 0.05 --trailing-stop-pct 0.1
+#       python vectorized.py --parity --sample 30   (backtrader 결과와 비교)
+#       python vectorized.py --parity --synthetic 10   (합성 데이터로 비교, 불일치 시 종료 코드 1)
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from brokers import load_minervini_frames
+from signals import SIGNALS, SIGNAL_MINPERIOD, DEFAULT_PARAMS, load_signals
+from config import consolidated_price_path, signal_cache_dir
+
+# MinerviniVCPStrategy 매매 파라미터 기본값
+STRATEGY_PARAMS = dict(
+    stop_loss=0.05,
+    trailing_stop_pct=0.1,
+    mansfield_threshold=8,
+)
+
+# MinerviniVCPStrategy.next: 수익률이 이 값 이상일 때부터 트레일링 스탑 적용
+MIN_TRAILING_STOP = 0.05
+
+# backtrader SharpeRatio 기본값 (연 단위 수익률, 무위험 수익률 1%)
+RISK_FREE_RATE = 0.01
+
+
+class SignalMatrix:
+    """
+    전 종목 시가/종가/사전 계산 신호를 (날짜 x 종목) 매트릭스로 모은 것.
+    날짜는 전 종목 거래일의 합집합이고, 봉이 없는 날은 backtrader 피드처럼 직전 봉 값을 유지합니다.
+    cache_dir: 신호 디스크 캐시 위치
+    """
+
+    def __init__(self, frames, signal_params=None, start=None, end=None, cache_dir=signal_cache_dir):
+        sliced = start is not None or end is not None
+        tables = {}
+        for code, df_bt in frames.items():
+            df = df_bt[['open', 'close', 'liquid']].join(load_signals(df_bt, code, cache_dir=cache_dir, **(signal_params or {})))
+            if sliced:
+                df = df.loc[start:end]
+                if df.empty:
+                    continue
+            tables[code] = df
+
+        self.codes = list(tables)
+        dates = np.unique(np.concatenate([df.index.to_numpy() for df in tables.values()])) if tables else []
+        self.dates = pd.DatetimeIndex(dates)
+
+        shape = (len(self.dates), len(self.codes))
+        self.has_bar = np.zeros(shape, dtype=bool)
+        values = {column: np.full(shape, np.nan) for column in ['open', 'close', 'liquid'] + SIGNALS}
+        for j, df in enumerate(tables.values()):
+            rows = self.dates.searchsorted(df.index)
+            self.has_bar[rows, j] = True
+            for column, matrix in values.items():
+                matrix[rows, j] = df[column].to_numpy(dtype='float64')
+
+        self.open = values['open']
+        self.close, self.liquid, self.trend, self.mansfield_rs, self.vcp, self.breakout = (
+            pd.DataFrame(values[column]).ffill().to_numpy() for column in ['close', 'liquid'] + SIGNALS
+        )
+        # 구간을 자르면 신호가 이미 워밍업된 상태 (make_minervini_feeds와 동일)
+        self.minperiod = 1 if sliced else SIGNAL_MINPERIOD
+
+
+def simulate(matrix, stop_loss=0.05, trailing_stop_pct=0.1, mansfield_threshold=8,
+             init_cash=1000000, commission=0.0005):
+    """
+    MinerviniVCPStrategy를 backtrader 기본 브로커와 같은 규칙으로 날짜 순서대로 시뮬레이션합니다.
+    매 봉 종목 방향은 배열 연산으로 처리합니다.
+
+    - 신호 봉 종가로 주문 (1주), 다음 봉 시가에 체결
+    - 주문 접수: 직전 봉에 낸 주문을 종가 기준으로 누적 현금을 차감해 보고 음수가 되는 주문은 거부 (checksubmit)
+    - 체결: 접수 순서대로, 현금이 부족한 매수는 거부
+    - 전 종목이 최소 기간을 채운 봉부터 신호 판단
+
+    반환: (날짜별 평가금액 배열, 청산된 거래 손익(수수료 포함) 배열, 진입 횟수)
+    """
+    n, k = matrix.close.shape
+    cash = float(init_cash)
+    equity = np.empty(n)
+    started = (np.cumsum(matrix.has_bar, axis=0) >= matrix.minperiod).all(axis=1)
+
+    position = np.zeros(k, dtype=bool)
+    entry_price = np.zeros(k)          # 체결가
+    entry_comm = np.zeros(k)
+    buy_price = np.full(k, np.nan)     # 신호 봉 종가 (손절/트레일링 기준)
+    highest = np.zeros(k)
+
+    submitted = np.zeros(k, dtype=bool)
+    submitted_buy = np.zeros(k, dtype=bool)
+    created_price = np.zeros(k)
+    pending = np.zeros(k, dtype=bool)
+    pending_buy = np.zeros(k, dtype=bool)
+    pending_seq = np.zeros(k, dtype=np.int64)
+    seq = 0
+
+    pnls, opened = [], 0
+    for t in range(n):
+        # 1) 주문 접수 확인
+        idx = np.flatnonzero(submitted)
+        if len(idx):
+            price = created_price[idx]
+            comm = price * commission
+            delta = np.where(submitted_buy[idx], -(price + comm), price - comm)
+            accepted = idx[cash + np.cumsum(delta) >= 0.0]
+            pending[accepted] = True
+            pending_buy[accepted] = submitted_buy[accepted]
+            pending_seq[accepted] = seq + np.arange(len(accepted))
+            seq += len(accepted)
+            submitted[:] = False
+
+        # 2) 이번 봉이 있는 종목의 대기 주문을 시가에 체결
+        idx = np.flatnonzero(pending & matrix.has_bar[t])
+        if len(idx):
+            idx = idx[np.argsort(pending_seq[idx])]
+            buy = pending_buy[idx]
+            price = matrix.open[t, idx]
+            comm = price * commission
+            delta = np.where(buy, -(price + comm), price - comm)
+            running = cash + np.cumsum(delta)
+            if (running >= 0.0).all():
+                filled = np.ones(len(idx), dtype=bool)
+                cash = float(running[-1])
+            else:
+                # 현금 부족 매수가 섞인 날만 순서대로 처리 (거부된 주문은 현금에 영향 없음)
+                filled = np.zeros(len(idx), dtype=bool)
+                for j in range(len(idx)):
+                    if buy[j] and cash + delta[j] < 0.0:
+                        continue
+                    cash += delta[j]
+                    filled[j] = True
+            pending[idx] = False
+
+            bought = idx[buy & filled]
+            position[bought] = True
+            entry_price[bought] = price[buy & filled]
+            entry_comm[bought] = comm[buy & filled]
+            opened += len(bought)
+
+            sold = idx[~buy]
+            pnls.extend(price[~buy] - entry_price[sold] - entry_comm[sold] - comm[~buy])
+            position[sold] = False
+
+        equity[t] = cash + matrix.close[t, position].sum()
+        if not started[t]:
+            continue
+
+        # 3) 전략 next: 대기 주문이 없는 종목만 진입/청산 판단
+        close = matrix.close[t]
+        free = ~pending
+        entry = (
+            free & ~position
+            & (matrix.liquid[t] != 0)
+            & (matrix.trend[t] != 0)
+            & (matrix.mansfield_rs[t] >= mansfield_threshold)
+            & (matrix.vcp[t] != 0)
+            & (matrix.breakout[t] != 0)
+        )
+        held = free & position
+        with np.errstate(invalid='ignore', divide='ignore'):
+            profit = (close - buy_price) / buy_price
+        trailing = held & (profit >= MIN_TRAILING_STOP)
+        highest[trailing] = np.maximum(highest[trailing], close[trailing])
+        exits = (
+            (trailing & (close <= highest * (1 - trailing_stop_pct)))
+            | (held & (close <= buy_price * (1 - stop_loss)))
+        )
+
+        buy_price[entry] = close[entry]
+        highest[entry] = close[entry]
+        submitted = entry | exits
+        submitted_buy = entry.copy()
+        created_price = close.copy()
+
+    return equity, np.array(pnls), opened
+
+
+def _sharpe(returns):
+    # backtrader SharpeRatio: (연 수익률 - 무위험 수익률) 평균 / 모표준편차
+    excess = [r - RISK_FREE_RATE for r in returns]
+    if not excess:
+        return None
+    avg = math.fsum(excess) / len(excess)
+    dev = math.sqrt(math.fsum((x - avg) ** 2 for x in excess) / len(excess))
+    return avg / dev if dev else None
+
+
+def summarize_equity(dates, equity, pnls, opened, init_cash):
+    """simulate 결과를 backtest.summarize와 같은 항목으로 정리합니다."""
+    if not len(equity):
+        return {'final_value': init_cash, 'returns': 0.0, 'sharpe': None, 'max_drawdown': 0.0,
+                'trades': 0, 'won': 0, 'lost': 0}
+
+    values = pd.Series(equity, index=dates)
+    yearly = values.groupby(dates.year).last()
+    annual = yearly / yearly.shift(1).fillna(init_cash) - 1
+    peak = np.maximum.accumulate(equity)
+    return {
+        'final_value': float(equity[-1]),
+        'returns': math.log(equity[-1] / init_cash),
+        'sharpe': _sharpe(annual.tolist()),
+        'max_drawdown': float(((peak - equity) / peak * 100).max()),
+        'trades': int(opened),
+        'won': int((pnls >= 0).sum()),
+        'lost': int((pnls < 0).sum()),
+    }
+
+
+def run_vectorized(params, frames, init_cash=1000000, commission=0.0005, start=None, end=None,
+                   daily_returns=False, matrix=None, cache_dir=signal_cache_dir):
+    """
+    optimize.run_one과 같은 입력/출력의 벡터화 엔진 실행 (사전 계산 신호 사용).
+    matrix: 같은 신호 파라미터로 미리 만든 SignalMatrix (없으면 frames로 생성)
+    cache_dir: 신호 디스크 캐시 위치
+    """
+    signal_params = {k: v for k, v in params.items() if k in DEFAULT_PARAMS}
+    trade_params = {k: v for k, v in params.items() if k in STRATEGY_PARAMS}
+    matrix = matrix or SignalMatrix(frames, signal_params, start=start, end=end, cache_dir=cache_dir)
+
+    equity, pnls, opened = simulate(matrix, init_cash=init_cash, commission=commission, **trade_params)
+    row = {**params, **summarize_equity(matrix.dates, equity, pnls, opened, init_cash)}
+    if daily_returns:
+        previous = np.r_[init_cash, equity[:-1]]
+        row['daily_returns'] = dict(zip(matrix.dates, equity / previous - 1))
+    return row
+
+
+def check_parity(frames, params=None, sample=30, seed=0, init_cash=1000000, commission=0.0005, rel_tol=1e-6,
+                 cache_dir=signal_cache_dir):
+    """
+    고정 표본 종목으로 backtrader(run_one, 사전 계산 신호)와 벡터화 엔진 결과를 비교합니다.
+    반환: (backtrader 결과, 벡터화 결과, 불일치 항목 목록)
+    """
+    from optimize import run_one
+
+    params = params or {}
+    codes = sorted(frames)
+    if sample and sample < len(codes):
+        codes = sorted(random.Random(seed).sample(codes, sample))
+    frames = {code: frames[code] for code in codes}
+
+    started = time.perf_counter()
+    expected = run_one(params, True, init_cash, commission, frames=frames, cache_dir=cache_dir)
+    bt_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = run_vectorized(params, frames, init_cash, commission, cache_dir=cache_dir)
+    vec_elapsed = time.perf_counter() - started
+
+    mismatches = []
+    for key in expected:
+        a, b = expected[key], actual.get(key)
+        if a is None or b is None:
+            same = a is b
+        else:
+            same = math.isclose(a, b, rel_tol=rel_tol, abs_tol=1e-9)
+        if not same:
+            mismatches.append((key, a, b))
+
+    logger.info(f"{len(codes)}종목 backtrader {bt_elapsed:.2f}s, 벡터화 {vec_elapsed:.2f}s")
+    for key, a, b in mismatches:
+        logger.warning(f"불일치 {key}: backtrader={a} 벡터화={b}")
+    return expected, actual, mismatches
+
+
+def check_synthetic_parity(n_tickers=10, params=None, years=5, seed=0, init_cash=1000000, commission=0.0005):
+    """
+    benchmark.make_daily의 결정적 합성 저장소로 check_parity를 실행합니다 (실제 저장소 / 신호 캐시 불필요).
+    저장소와 신호 캐시는 임시 디렉터리에 만들고 지우므로 매번 같은 입력으로 처음부터 계산합니다.
+    """
+    from benchmark import make_daily
+    from core.price_store import PriceStore
+
+    with tempfile.TemporaryDirectory(prefix='parity-') as root:
+        make_daily(n_tickers, years=years, seed=seed, root=root)
+        frames = load_minervini_frames(store=PriceStore(root), consolidated=os.path.join(root, 'ohlcv.arrow'))
+        return check_parity(frames, params, sample=0, init_cash=init_cash, commission=commission,
+                            cache_dir=os.path.join(root, 'signals'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--stop-loss', type=float, default=STRATEGY_PARAMS['stop_loss'])
+    parser.add_argument('--trailing-stop-pct', type=float, default=STRATEGY_PARAMS['trailing_stop_pct'])
+    parser.add_argument('--mansfield-threshold', type=float, default=STRATEGY_PARAMS['mansfield_threshold'])
+    parser.add_argument('--cash', type=float, default=1000000)
+    parser.add_argument('--parity', action='store_true', help='표본 종목으로 backtrader와 결과 비교')
+    parser.add_argument('--sample', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help='--parity를 저장소 대신 합성 종목 N개로 실행 (결정적, 불일치 시 종료 코드 1)')
+    args = parser.parse_args()
+
+    params = {
+        'stop_loss': args.stop_loss,
+        'trailing_stop_pct': args.trailing_stop_pct,
+        'mansfield_threshold': args.mansfield_threshold,
+    }
+    if args.parity and args.synthetic:
+        expected, actual, mismatches = check_synthetic_parity(args.synthetic, params, seed=args.seed,
+                                                              init_cash=args.cash)
+        print(pd.DataFrame([expected, actual], index=['backtrader', 'vectorized']).to_string())
+        raise SystemExit(1 if mismatches else 0)
+
+    frames = load_minervini_frames(consolidated=consolidated_price_path)
+    if args.parity:
+        expected, actual, mismatches = check_parity(frames, params, sample=args.sample, seed=args.seed,
+                                                    init_cash=args.cash)
+        print(pd.DataFrame([expected, actual], index=['backtrader', 'vectorized']).to_string())
+        raise SystemExit(1 if mismatches else 0)
+
+    started = time.perf_counter()
+    row = run_vectorized(params, frames, init_cash=args.cash)
+    logger.info(f"{len(frames)}종목 {time.perf_counter() - started:.2f}s")
+    print(pd.Series(row).to_string())
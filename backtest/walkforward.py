@@ -0,0 +1,141 @@
+# 실행: python walkforward.py --train-years 3 --test-months 6 --random 50 --workers 8
+import argparse
+import os
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import pandas as pd
+from loguru import logger
+
+from brokers import load_minervini_frames
+from optimize import SEARCH_SPACE, grid, random_search, make_pool, run_one
+from config import base_dir, consolidated_price_path
+
+
+def make_windows(dates, train_years=3, test_months=6):
+    """
+    [train_start, train_end] 학습 구간 + 바로 다음 [test_start, test_end] 검증 구간 목록.
+    검증 구간은 겹치지 않고 test_months씩 이어집니다.
+    """
+    first, last = pd.Timestamp(min(dates)), pd.Timestamp(max(dates))
+    windows = []
+    test_start = first + pd.DateOffset(years=train_years)
+    while test_start <= last:
+        test_end = min(test_start + pd.DateOffset(months=test_months) - pd.Timedelta(days=1), last)
+        windows.append({
+            'train_start': test_start - pd.DateOffset(years=train_years),
+            'train_end': test_start - pd.Timedelta(days=1),
+            'test_start': test_start,
+            'test_end': test_end,
+        })
+        test_start += pd.DateOffset(months=test_months)
+    return windows
+
+
+def _score(row, metric):
+    value = row.get(metric)
+    return float('-inf') if value is None or pd.isna(value) else value
+
+
+def walk_forward(combos, train_years=3, test_months=6, metric='sharpe', init_cash=1000000,
+                 max_workers=None, engine='backtrader', **loader_kwargs):
+    """
+    구간마다 학습 구간에서 combos 중 metric이 가장 좋은 파라미터를 고르고 다음 검증 구간에서 평가합니다.
+
+    - 지표 워밍업은 전체 이력으로 미리 계산해 캐시한 신호(backtest/signals.py)를 잘라 쓰므로 구간마다 다시 돌리지 않습니다.
+    - engine: 'backtrader' 또는 'vectorized' (optimize.run_one 참고)
+    - 모든 (구간, 조합) 학습 실행을 프로세스 풀에 한꺼번에 올리고, 한 구간의 학습이 끝나면 바로 검증을 실행합니다.
+
+    반환: (구간별 요약 DataFrame, 검증 구간 일별 수익률을 이어 붙인 자산 곡선 Series)
+    """
+    loader_kwargs.setdefault('consolidated', consolidated_price_path)
+    frames = load_minervini_frames(**loader_kwargs)
+    dates = [d for df in frames.values() for d in (df.index[0], df.index[-1])]
+    windows = make_windows(dates, train_years, test_months)
+    logger.info(f"워크포워드 구간: {len(windows)}개, 파라미터 조합: {len(combos)}개")
+
+    train_rows = {i: [] for i in range(len(windows))}
+    results = {}
+    with make_pool(max_workers, frames=frames, **loader_kwargs) as executor:
+        pending = {}
+        for i, window in enumerate(windows):
+            for combo in combos:
+                future = executor.submit(run_one, combo, True, init_cash,
+                                         start=window['train_start'], end=window['train_end'], engine=engine)
+                pending[future] = ('train', i)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                phase, i = pending.pop(future)
+                try:
+                    row = future.result()
+                except Exception as e:
+                    logger.error(f"{i}번 구간 {phase} 실행 실패: {e}")
+                    row = None
+
+                if phase == 'test':
+                    if row is not None:
+                        results[i].update(row)
+                    continue
+
+                train_rows[i].append(row)
+                if len(train_rows[i]) < len(combos):
+                    continue
+                # 학습 구간 최적 파라미터로 검증 구간 실행
+                scored = [r for r in train_rows[i] if r is not None]
+                if not scored:
+                    continue
+                best = max(scored, key=lambda r: _score(r, metric))
+                params = {k: best[k] for k in combos[0]}
+                window = windows[i]
+                logger.info(f"{i}번 구간 ({window['test_start']:%Y-%m-%d}~) 최적 파라미터: {params}")
+                future = executor.submit(run_one, params, True, init_cash,
+                                         start=window['test_start'], end=window['test_end'], daily_returns=True,
+                                         engine=engine)
+                pending[future] = ('test', i)
+                results[i] = {'train_' + metric: best.get(metric), **params}
+
+    summary, returns = [], []
+    for i, window in enumerate(windows):
+        row = results.get(i)
+        if not row or 'daily_returns' not in row:
+            continue
+        returns.append(pd.Series(row.pop('daily_returns')))
+        summary.append({**window, **row})
+
+    if not returns:
+        return pd.DataFrame(summary), pd.Series(dtype='float64')
+
+    # 검증 구간 일별 수익률을 이어 붙여 하나의 자산 곡선으로
+    daily = pd.concat(returns).sort_index()
+    daily = daily[~daily.index.duplicated(keep='last')]
+    equity = init_cash * (1 + daily).cumprod()
+    return pd.DataFrame(summary), equity.rename('equity')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--train-years', type=int, default=3)
+    parser.add_argument('--test-months', type=int, default=6)
+    parser.add_argument('--metric', default='sharpe', choices=['sharpe', 'returns', 'final_value'])
+    parser.add_argument('--random', type=int, default=0, help='랜덤 탐색 횟수 (없으면 SEARCH_SPACE 목록형 파라미터 전체 조합)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cash', type=float, default=1000000)
+    parser.add_argument('--engine', default='backtrader', choices=['backtrader', 'vectorized'])
+    args = parser.parse_args()
+
+    if args.random:
+        combos = random_search(SEARCH_SPACE, args.random, seed=args.seed)
+    else:
+        combos = grid({k: v for k, v in SEARCH_SPACE.items() if isinstance(v, list)})
+
+    summary, equity = walk_forward(combos, args.train_years, args.test_months, metric=args.metric,
+                                   init_cash=args.cash, max_workers=args.workers, engine=args.engine)
+    out_dir = os.path.join(base_dir, 'data')
+    os.makedirs(out_dir, exist_ok=True)
+    summary.to_csv(os.path.join(out_dir, 'walkforward.csv'), index=False)
+    equity.to_csv(os.path.join(out_dir, 'walkforward_equity.csv'))
+    print(summary.to_string())
+    if not equity.empty:
+        print(f"최종 자산: {equity.iloc[-1]:,.0f} (누적 수익률 {equity.iloc[-1] / args.cash - 1:.2%})")
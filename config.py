@@ -8,5 +8,33 @@ is_paper_trading = False
 api_key = os.getenv("API_KEY")
 api_secret_key = os.getenv("API_SECRET_KEY")
 
-host = "https://mockapi.kiwoom.com" if is_paper_trading else "https://api.kiwoom.com"
-socket_url = "wss://mockapi.kiwoom.com:10000/api/dostk/websocket" if is_paper_trading else "wss://api.kiwoom.com:10000/api/dostk/websocket"
\ No newline at end of file
+# 키움 REST / 웹소켓 주소 (벤치마크 등에서 로컬 대역 서버로 바꿀 수 있음)
+host = os.getenv("KIWOOM_HOST", "https://mockapi.kiwoom.com" if is_paper_trading else "https://api.kiwoom.com")
+socket_url = os.getenv("KIWOOM_SOCKET_URL", "wss://mockapi.kiwoom.com:10000/api/dostk/websocket" if is_paper_trading else "wss://api.kiwoom.com:10000/api/dostk/websocket")
+
+# 로컬 OHLCV 저장소 (스크리너/백테스트 공용)
+base_dir = os.path.dirname(os.path.abspath(__file__))
+price_store_dir = os.getenv("PRICE_STORE_DIR", os.path.join(base_dir, "data", "ohlcv"))
+consolidated_price_path = os.getenv("CONSOLIDATED_PRICE_PATH", os.path.join(base_dir, "data", "ohlcv.arrow"))  # 백테스트용 통합 파일 (메모리 매핑)
+price_fetch_workers = int(os.getenv("PRICE_FETCH_WORKERS", "8"))  # 누락 시세 동시 조회 수
+price_fetch_rate = float(os.getenv("PRICE_FETCH_RATE", "5"))  # 초당 조회 한도
+signal_cache_dir = os.getenv("SIGNAL_CACHE_DIR", os.path.join(base_dir, "data", "signals"))  # 백테스트 사전 계산 신호
+
+# 조건검색식 이름 / POST /filter 결과 캐시 (장중 갱신 주기, 초. 0이면 캐시 사용 안 함)
+condition_name = os.getenv("CONDITION_NAME", "트렌드 템플릿")
+filter_cache_ttl = int(os.getenv("FILTER_CACHE_TTL", "300"))
+condition_search_timeout = float(os.getenv("CONDITION_SEARCH_TIMEOUT", "30"))  # 조건검색 응답 대기 (초)
+realtime_condition = os.getenv("REALTIME_CONDITION", "1") == "1"  # 앱 수명 실시간 조건검색 세션 사용
+screen_workers = int(os.getenv("SCREEN_WORKERS", "2"))  # POST /filter 작업을 실행하는 워커 스레드 수
+job_result_ttl = int(os.getenv("JOB_RESULT_TTL", "3600"))  # 끝난 작업(상태 / 결과) 보관 시간 (초)
+
+# 업종명(ka10100) 영구 캐시
+industry_cache_path = os.getenv("INDUSTRY_CACHE_PATH", os.path.join(base_dir, "data", "industry.json"))
+industry_cache_max_age_days = int(os.getenv("INDUSTRY_CACHE_MAX_AGE_DAYS", "90"))
+
+# 분기 실적 (네이버 금융) 영구 캐시
+naver_host = os.getenv("NAVER_STOCK_HOST", "https://m.stock.naver.com")
+fundamentals_cache_path = os.getenv("FUNDAMENTALS_CACHE_PATH", os.path.join(base_dir, "data", "fundamentals.json"))
+
+# 키움 REST TR 초당 호출 한도
+tr_rate_limit = float(os.getenv("TR_RATE_LIMIT", "5"))
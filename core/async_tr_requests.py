@@ -0,0 +1,150 @@
+# minervini/core/async_tr_requests.py
+import asyncio
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import aiohttp
+from loguru import logger
+from config import host, tr_rate_limit
+from core.token_manager import token_provider
+from utils.rate_limiter import AsyncRateLimiter
+from core.metrics import metrics
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 초당 TR 한도는 계정 단위이므로 프로세스의 모든 인스턴스 / 이벤트 루프가 하나의 버킷을 공유합니다.
+tr_limiter = AsyncRateLimiter(tr_rate_limit)
+
+
+def retry_after_seconds(value, default):
+    """Retry-After 헤더(초 또는 HTTP-date)를 대기 초로 변환합니다. 없거나 해석할 수 없으면 default."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AsyncKiwoomTR:
+    """
+    KiwoomTR의 asyncio 버전.
+    keep-alive 커넥션 풀을 공유하고, 초당 TR 한도에 맞춘 토큰 버킷(기본: 프로세스 전역 tr_limiter)으로 호출 속도를 조절합니다.
+
+    async with AsyncKiwoomTR() as kiwoom_tr:
+        up_name = await kiwoom_tr.fn_ka10100({'stk_cd': '005930'})
+    """
+
+    def __init__(self, token=None, limiter=None, max_retries=3, backoff=0.5, pool_size=20):
+        self.token = token
+        self.limiter = limiter or tr_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                base_url=host,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def login(self):
+        # 고정 토큰이 없으면 프로세스 전역 토큰을 사용합니다.
+        return self.token or await token_provider.get_token_async()
+
+    async def request(self, api_id, data, endpoint='/api/dostk/stkinfo', cont_yn='N', next_key=''):
+        """(응답 body, 연속조회 여부, next-key) 반환. 429/5xx 및 연결 오류는 지수 백오프로 재시도합니다."""
+        headers = {
+            'Content-Type': 'application/json;charset=UTF-8',
+            'authorization': f'Bearer {await self.login()}', # 접근토큰
+            'cont-yn': cont_yn, # 연속조회여부
+            'next-key': next_key, # 연속조회키
+            'api-id': api_id, # TR명
+        }
+
+        with metrics.span('kiwoom_tr_seconds', api_id=api_id):
+            return await self._request(api_id, data, endpoint, headers)
+
+    async def _request(self, api_id, data, endpoint, headers):
+        for attempt in range(self.max_retries + 1):
+            with metrics.span('rate_limit_wait_seconds', limiter='kiwoom_tr'):
+                await self.limiter.acquire()
+            try:
+                async with self.session.post(endpoint, headers=headers, json=data) as response:
+                    metrics.inc('kiwoom_tr_calls_total', api_id=api_id, status=response.status)
+                    if response.status == 401 and self.token is None and attempt < self.max_retries:
+                        # 만료/폐기된 토큰은 재발급 후 재시도
+                        metrics.inc('kiwoom_tr_retries_total', api_id=api_id, reason=response.status)
+                        token_provider.invalidate()
+                        headers['authorization'] = f'Bearer {await self.login()}'
+                        continue
+                    if response.status in RETRY_STATUS and attempt < self.max_retries:
+                        metrics.inc('kiwoom_tr_retries_total', api_id=api_id, reason=response.status)
+                        delay = retry_after_seconds(response.headers.get('Retry-After'), self.backoff * 2 ** attempt)
+                        logger.warning(f"{api_id} HTTP {response.status}, {delay:.1f}초 후 재시도")
+                        await asyncio.sleep(delay)
+                        continue
+                    if response.status >= 400:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status,
+                            message=f"HTTP Error: {response.status}\nResponse Body: {await response.text()}"
+                        )
+                    metrics.inc('kiwoom_tr_response_bytes_total', len(await response.read()), api_id=api_id)
+                    body = await response.json(content_type=None)
+                    has_next = response.headers.get('cont-yn') == 'Y'
+                    return body, has_next, response.headers.get('next-key', '')
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                metrics.inc('kiwoom_tr_calls_total', api_id=api_id, status='error')
+                if attempt == self.max_retries:
+                    raise
+                metrics.inc('kiwoom_tr_retries_total', api_id=api_id, reason='connection')
+                delay = self.backoff * 2 ** attempt
+                logger.warning(f"{api_id} 연결 오류: {e}, {delay:.1f}초 후 재시도")
+                await asyncio.sleep(delay)
+
+    async def paginate(self, api_id, data, endpoint='/api/dostk/stkinfo'):
+        """cont-yn / next-key 연속조회를 따라가며 페이지 body를 순서대로 내보냅니다."""
+        cont_yn, next_key = 'N', ''
+        while True:
+            body, has_next, next_key = await self.request(api_id, data, endpoint, cont_yn, next_key)
+            yield body
+            if not has_next:
+                break
+            cont_yn = 'Y'
+
+    async def fn_ka10099(self, data):
+        stocks = []
+        async for body in self.paginate('ka10099', data):
+            stocks += body.get('list', [])
+        return stocks
+
+    async def fn_ka10100(self, data):
+        body, _, _ = await self.request('ka10100', data)
+        return body['upName']
+
+    async def fn_ka10001(self, data):
+        # 주식기본정보요청
+        body, _, _ = await self.request('ka10001', data)
+        return body
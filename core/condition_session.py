@@ -0,0 +1,126 @@
+# minervini/core/condition_session.py
+import asyncio
+import threading
+from loguru import logger
+from config import socket_url, condition_name, condition_search_timeout
+from core.websocket_client import WebSocketClient
+from core.async_tr_requests import AsyncKiwoomTR
+
+# 조건검색 결과의 시세 컬럼. 세션은 시세를 갱신하지 않으므로 snapshot에서는 비워 둡니다.
+QUOTE_COLUMNS = ['현재가', '전일대비', '등락율', '누적거래량', '시가', '고가', '저가']
+
+
+class ConditionSession:
+    """
+    앱 수명 동안 유지되는 조건검색 웹소켓 세션.
+
+    로그인된 연결 하나로 실시간 조건검색(search_type=1)을 등록하고,
+    편입/이탈(REAL) 이벤트로 현재 편입 종목(종목코드 / 종목명)을 메모리에 유지합니다.
+    ready는 최초 편입 종목의 종목명까지 채운 뒤에 켜집니다.
+    연결이 끊기면 지수 백오프로 재연결합니다.
+    편입 종목은 세션 루프가 갱신하고 작업 워커 스레드(app/jobs.py)가 snapshot으로 읽으므로 lock으로 보호합니다.
+    """
+
+    def __init__(self, uri=socket_url, condition_name=condition_name, max_backoff=60):
+        self.uri = uri
+        self.condition_name = condition_name
+        self.max_backoff = max_backoff
+        self.members = {}
+        self._members_lock = threading.Lock()
+        self.ready = False
+        self.client = None
+        self._task = None
+        self._fill_tasks = set()
+        self._kiwoom_tr = AsyncKiwoomTR()
+
+    def is_ready(self, condition_name=None):
+        return self.ready and condition_name in (None, self.condition_name)
+
+    def snapshot(self):
+        """현재 편입 종목 (조건검색 결과와 같은 형태의 row 리스트, 시세 컬럼은 None)"""
+        with self._members_lock:
+            return [{**row, **dict.fromkeys(QUOTE_COLUMNS)} for row in self.members.values()]
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._fill_tasks):
+            task.cancel()
+        await asyncio.gather(*self._fill_tasks, return_exceptions=True)
+        if self.client is not None:
+            await self.client.disconnect()
+        await self._kiwoom_tr.close()
+
+    async def _run_forever(self):
+        backoff = 1
+        while True:
+            self.client = WebSocketClient(self.uri, condition_name=self.condition_name)
+            self.client.on_condition_event = self._on_condition_event
+            try:
+                await self.client.connect()
+                receive_task = asyncio.create_task(self.client.receive_messages())
+                rows = await self.client.search_condition(timeout=condition_search_timeout, search_type='1')
+                with self._members_lock:
+                    self.members = {row['종목코드']: {'종목코드': row['종목코드'], '종목명': row.get('종목명')} for row in rows}
+                await self._fill_details(list(self.members))
+                self.ready = True
+                backoff = 1
+                logger.info(f"실시간 조건검색 등록 완료: {len(self.members)}종목")
+                # 연결이 끊길 때까지 수신 (PING 응답 / REAL 이벤트 처리)
+                await receive_task
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"조건검색 세션 오류: {e}")
+            finally:
+                self.ready = False
+                await self.client.disconnect()
+
+            logger.info(f"{backoff}초 후 조건검색 세션 재연결")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _on_condition_event(self, code, inserted):
+        with self._members_lock:
+            if inserted:
+                self.members.setdefault(code, {'종목코드': code})
+            else:
+                self.members.pop(code, None)
+        if inserted:
+            # 태스크 참조를 보관해 도중에 GC되지 않게 하고 stop에서 취소합니다.
+            task = asyncio.create_task(self._fill_details([code]))
+            self._fill_tasks.add(task)
+            task.add_done_callback(self._fill_tasks.discard)
+
+    async def _fill_details(self, codes):
+        # 실시간 편입 이벤트 / 등록 응답에는 종목코드만 오므로 ka10001로 종목명을 채웁니다.
+        with self._members_lock:
+            codes = [code for code in codes if self.members.get(code, {}).get('종목명') is None]
+        if not codes:
+            return
+        await self._kiwoom_tr.open()
+
+        async def fill(code):
+            try:
+                body = await self._kiwoom_tr.fn_ka10001(data={'stk_cd': code})
+            except Exception as e:
+                logger.warning(f"{code} 기본정보 조회 실패: {e}")
+                return
+            with self._members_lock:
+                if code in self.members:
+                    # 읽는 쪽이 반쯤 갱신된 row를 보지 않도록 새 row로 교체
+                    self.members[code] = {**self.members[code], '종목명': body.get('stk_nm')}
+
+        await asyncio.gather(*(fill(code) for code in codes))
+
+
+condition_session = ConditionSession()
@@ -0,0 +1,176 @@
+# minervini/core/metrics.py
+import bisect
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# 초 단위 히스토그램 경계 (Prometheus 기본값 + 긴 외부 호출용)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 현재 요청(스크리닝 한 번)의 Timings. asyncio 태스크 / to_thread는 생성 시점 컨텍스트를 물려받습니다.
+_timings = contextvars.ContextVar('timings', default=None)
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels) + '}'
+
+
+def _number(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _format_key(key):
+    name, labels = key
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{k}={v}' for k, v in labels) + '}'
+
+
+class Timings:
+    """요청 단위 span / 카운터 합계. collect_timings()로 현재 컨텍스트에 연결됩니다."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.spans = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, key, seconds):
+        with self._lock:
+            count, total = self.spans.get(key, (0, 0.0))
+            self.spans[key] = (count + 1, total + seconds)
+
+    def add_counter(self, key, amount):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def summary(self):
+        """{'total': 초, 'spans': {이름{라벨}: {'count', 'seconds'}}, 'counters': {이름{라벨}: 값}}"""
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        with self._lock:
+            spans = sorted(self.spans.items())
+            counters = sorted(self.counters.items())
+        return {
+            'total': round(elapsed, 4),
+            'spans': {_format_key(key): {'count': count, 'seconds': round(total, 4)} for key, (count, total) in spans},
+            'counters': {_format_key(key): value for key, value in counters},
+        }
+
+
+class MetricsRegistry:
+    """
+    프로세스 전역 카운터 / 히스토그램 (여러 스레드가 공유).
+    기록한 값은 collect_timings()로 연결된 현재 요청의 Timings에도 함께 더해집니다.
+
+    with metrics.span('kiwoom_tr_seconds', api_id='ka10100'):
+        ...
+    metrics.inc('cache_hits_total', 3, cache='industry')
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        timings = _timings.get()
+        if timings is not None:
+            timings.add_counter(key, amount)
+
+    def observe(self, name, seconds, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # [경계별 개수 (누적 아님), 합계, 개수]
+                histogram = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect.bisect_left(self.buckets, seconds)
+            if i < len(self.buckets):
+                histogram[0][i] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+        timings = _timings.get()
+        if timings is not None:
+            timings.add_span(key, seconds)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """with 블록 실행 시간(초)을 히스토그램 name에 기록합니다. 예외가 나도 기록합니다."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: ([*counts], total, count) for key, (counts, total, count) in self._histograms.items()}
+
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (_, labels), value in sorted((k, v) for k, v in counters.items() if k[0] == name):
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {name} histogram")
+            for (_, labels), (counts, total, count) in sorted((k, v) for k, v in histograms.items() if k[0] == name):
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(float(bound))),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def collect_timings():
+    """
+    with 블록 동안(그 안에서 만든 태스크 / to_thread 호출 포함) 기록된 span / 카운터를 Timings로 모읍니다.
+    ThreadPoolExecutor 워커에는 컨텍스트가 전달되지 않으므로 bind_context로 감싸 넘깁니다.
+    """
+    timings = Timings()
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        timings.elapsed = time.perf_counter() - timings.started
+        try:
+            _timings.reset(token)
+        except ValueError:
+            # 다른 컨텍스트에서 닫힌 비동기 제너레이터 (스트리밍 응답 중 연결 종료)
+            pass
+
+
+def bind_context(func):
+    """호출 시점의 컨텍스트(현재 요청의 Timings)를 다른 스레드에서 실행되는 func에 물려줍니다."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+metrics = MetricsRegistry()
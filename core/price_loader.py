@@ -0,0 +1,101 @@
+# minervini/core/price_loader.py
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from loguru import logger
+from config import price_fetch_workers, price_fetch_rate
+from core.price_store import FIELDS, default_store
+from utils.rate_limiter import RateLimiter
+
+# FDR 초당 조회 한도는 동시에 실행 중인 스크리닝(작업 큐 워커) 전체가 하나의 버킷으로 나눠 씁니다.
+fetch_limiter = RateLimiter(price_fetch_rate)
+
+
+class PriceWindow:
+    """
+    단계 하나가 필요로 하는 시세 구간.
+
+    start  : 조회 시작일
+    fields : 필요한 OHLCV 컬럼
+    codes  : 조건검색 종목 외에 추가로 필요한 코드 (예: 시장 지수 KS11)
+    """
+
+    def __init__(self, start, fields=FIELDS, codes=()):
+        self.start = pd.Timestamp(start).normalize()
+        self.fields = list(fields)
+        self.codes = list(codes)
+
+
+class PriceBundle:
+    """
+    요청 단위로 한 번만 읽은 시세 (Code, Date 정렬 long 포맷, Date 인덱스).
+    종목별 구간은 위치 슬라이스로 잘라내므로 단계마다 프레임을 복사하지 않습니다.
+    """
+
+    def __init__(self, frame):
+        frame = frame.sort_values(['Code', 'Date'], kind='stable')
+        self.frame = frame.set_index('Date')
+        codes = self.frame['Code'].to_numpy()
+        bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        starts = np.r_[0, bounds] if len(codes) else np.array([], dtype=int)
+        ends = np.r_[bounds, len(codes)] if len(codes) else np.array([], dtype=int)
+        self._slices = {codes[a]: (a, b) for a, b in zip(starts, ends)}
+
+    def codes(self):
+        return list(self._slices)
+
+    def history(self, code, start=None):
+        """단일 종목 (Date 인덱스) 뷰. 없는 종목은 빈 프레임"""
+        a, b = self._slices.get(code, (0, 0))
+        df = self.frame.iloc[a:b]
+        if start is not None:
+            df = df.iloc[df.index.searchsorted(pd.Timestamp(start).normalize()):]
+        return df
+
+    def aligned(self, codes, field, start=None):
+        """
+        종목별 봉을 마지막 봉 기준으로 오른쪽 정렬한 (봉 위치 x 종목) 매트릭스.
+        날짜가 아니라 각 종목 자신의 봉 순서를 따르므로 거래정지일이 NaN으로 끼어들지 않습니다.
+        """
+        bounds = np.array([self._slices.get(code, (0, 0)) for code in codes], dtype=np.int64).reshape(-1, 2)
+        first, last = bounds[:, 0], bounds[:, 1]
+        if start is not None:
+            dates = self.frame.index.to_numpy()
+            day = np.datetime64(pd.Timestamp(start).normalize())
+            first = np.array([a + np.searchsorted(dates[a:b], day) for a, b in bounds], dtype=np.int64)
+        lengths = last - first
+        length = int(lengths.max(initial=0))
+
+        # 종목 i의 k번째 봉 -> 행 (length - lengths[i] + k), 열 i
+        offsets = np.cumsum(lengths) - lengths
+        k = np.arange(lengths.sum()) - np.repeat(offsets, lengths)
+        matrix = np.full((length, len(bounds)), np.nan)
+        values = self.frame[field].to_numpy(dtype='float64')
+        matrix[np.repeat(length - lengths, lengths) + k, np.repeat(np.arange(len(bounds)), lengths)] = values[np.repeat(first, lengths) + k]
+        return pd.DataFrame(matrix, columns=list(codes))
+
+    def wide(self, codes, field='Close', start=None):
+        """(날짜 x 종목) 매트릭스"""
+        frame = self.frame[self.frame['Code'].isin(list(codes))]
+        if start is not None:
+            frame = frame[frame.index >= pd.Timestamp(start).normalize()]
+        wide = frame.pivot(columns='Code', values=field)
+        return wide.reindex(columns=list(codes)).sort_index()
+
+
+def load_prices(codes, windows, end=None, store=None, max_workers=price_fetch_workers, limiter=None):
+    """
+    여러 단계의 PriceWindow를 합친 구간(가장 이른 시작일, 컬럼 합집합)을
+    종목당 한 번만 채우고 읽어 PriceBundle로 반환합니다.
+    limiter: 누락 구간 조회 속도 제한 (기본: 프로세스 전역 fetch_limiter)
+    """
+    end = end or datetime.today()
+    store = store or default_store()
+
+    start = min(window.start for window in windows)
+    fields = [f for f in FIELDS if any(f in window.fields for window in windows)]
+    codes = list(dict.fromkeys(list(codes) + [c for window in windows for c in window.codes]))
+
+    logger.info(f"시세 로드: {len(codes)}종목, {start:%Y-%m-%d} ~ {end:%Y-%m-%d}, {fields}")
+    store.ensure(codes, start, end, max_workers=max_workers, limiter=limiter or fetch_limiter)
+    return PriceBundle(store.read(codes, start, end, fields=fields))
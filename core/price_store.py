@@ -0,0 +1,301 @@
+# minervini/core/price_store.py
+import os
+import glob
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import FinanceDataReader as fdr
+from pandas.tseries.offsets import BDay
+from loguru import logger
+from config import price_store_dir, consolidated_price_path
+from utils.market_session import now_kst, trading_date
+from core.metrics import metrics, bind_context
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+INDEX_FILE = '_index.parquet'
+
+
+def last_session(end=None):
+    """end 시점까지 완료됐어야 하는 마지막 거래일 (주말 및 장 시작 전은 직전 영업일, 오늘은 KST 기준)."""
+    now = now_kst()
+    today = pd.Timestamp(now.date())
+    if end is None or pd.Timestamp(end).normalize() == today:
+        return pd.Timestamp(trading_date(now))
+    day = pd.Timestamp(end).normalize()
+    if day.weekday() >= 5:
+        day -= BDay(1)
+    return day
+
+
+class PriceStore:
+    """
+    월 단위 날짜 파티션 + 종목코드 인덱스로 구성된 로컬 OHLCV 저장소.
+
+    root/
+        _index.parquet              종목코드별 보유 구간 (start, end, checked)
+        month=YYYY-MM/part-*.parquet  Date, Code, Open, High, Low, Close, Volume
+    """
+
+    def __init__(self, root=price_store_dir, fetcher=fdr.DataReader):
+        self.root = root
+        self.fetcher = fetcher
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._index = self._load_index()
+
+    # ---------- 인덱스 ----------
+    def _load_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=['start', 'end', 'checked'], index=pd.Index([], name='Code'))
+        return pd.read_parquet(path)
+
+    def _save_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        self._index.to_parquet(tmp)
+        os.replace(tmp, path)
+
+    def tickers(self):
+        return self._index.index.tolist()
+
+    def coverage(self, code):
+        """(start, end, checked) 또는 None"""
+        if code not in self._index.index:
+            return None
+        row = self._index.loc[code]
+        return row['start'], row['end'], row['checked']
+
+    # ---------- 쓰기 ----------
+    def write(self, frame, start=None, checked=None):
+        """
+        Date, Code, OHLCV 컬럼의 long 포맷 프레임을 월 파티션에 추가합니다.
+        start: 이 프레임이 조회한 구간의 시작일 (상장 이전 구간도 보유한 것으로 기록)
+        """
+        if frame.empty:
+            return
+        frame = frame[['Date', 'Code'] + FIELDS].copy()
+        frame['Date'] = pd.to_datetime(frame['Date'])
+        frame[FIELDS] = frame[FIELDS].astype('float64')
+
+        stamp = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+        for month, part in frame.groupby(frame['Date'].dt.strftime('%Y-%m')):
+            part_dir = os.path.join(self.root, f"month={month}")
+            os.makedirs(part_dir, exist_ok=True)
+            part.to_parquet(os.path.join(part_dir, f"part-{stamp}.parquet"), index=False)
+
+        bounds = frame.groupby('Code')['Date'].agg(['min', 'max'])
+        with self._lock:
+            self._index = self._load_index()
+            for code, row in bounds.iterrows():
+                new_start = min(row['min'], pd.Timestamp(start)) if start is not None else row['min']
+                new_checked = pd.Timestamp(checked) if checked is not None else row['max']
+                if code in self._index.index:
+                    old = self._index.loc[code]
+                    new_start = min(old['start'], new_start)
+                    row_max = max(old['end'], row['max'])
+                    new_checked = max(old['checked'], new_checked)
+                else:
+                    row_max = row['max']
+                self._index.loc[code, ['start', 'end', 'checked']] = [new_start, row_max, new_checked]
+            self._index = self._index.astype('datetime64[ns]')
+            self._save_index()
+
+    def put(self, code, df, start=None, checked=None):
+        """FinanceDataReader 형태(Date 인덱스, OHLCV 컬럼) 프레임을 저장합니다."""
+        if df is None or df.empty:
+            return
+        frame = df[FIELDS].copy()
+        frame.index.name = 'Date'
+        frame = frame.reset_index()
+        frame['Code'] = code
+        self.write(frame, start=start, checked=checked)
+
+    def append_day(self, date, df):
+        """하루치 시세(종목코드 인덱스, OHLCV 컬럼)를 추가합니다."""
+        frame = df[FIELDS].copy()
+        frame.index.name = 'Code'
+        frame = frame.reset_index()
+        frame['Date'] = pd.Timestamp(date).normalize()
+        self.write(frame)
+
+    def compact(self):
+        """파티션별 part 파일을 하나로 합치고 중복(Date, Code)을 제거합니다."""
+        for part_dir in sorted(glob.glob(os.path.join(self.root, 'month=*'))):
+            files = sorted(glob.glob(os.path.join(part_dir, 'part-*.parquet')))
+            if len(files) <= 1:
+                continue
+            merged = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+            merged = merged.drop_duplicates(['Date', 'Code'], keep='last').sort_values(['Code', 'Date'])
+            stamp = f"{time.time_ns()}-{os.getpid()}-{threading.get_ident()}"
+            merged.to_parquet(os.path.join(part_dir, f"part-{stamp}.parquet"), index=False)
+            for f in files:
+                os.remove(f)
+
+    # ---------- 읽기 ----------
+    def _files(self, start, end):
+        months = pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq='M').strftime('%Y-%m')
+        files = []
+        for month in months:
+            files += sorted(glob.glob(os.path.join(self.root, f"month={month}", 'part-*.parquet')))
+        return files
+
+    def read(self, codes, start, end, fields=FIELDS):
+        """여러 종목의 [start, end] 구간을 long 포맷(Date, Code, fields)으로 읽습니다."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end)
+        columns = ['Date', 'Code'] + list(fields)
+        codes = list(codes)
+        parts = [
+            pd.read_parquet(f, columns=columns, filters=[('Code', 'in', codes)])
+            for f in self._files(start, end)
+        ]
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        frame = pd.concat(parts, ignore_index=True)
+        frame = frame[(frame['Date'] >= start) & (frame['Date'] <= end)]
+        frame = frame.drop_duplicates(['Date', 'Code'], keep='last')
+        return frame.sort_values(['Code', 'Date']).reset_index(drop=True)
+
+    def read_all(self, fields=FIELDS, max_workers=8):
+        """저장소 전체를 long 포맷으로 읽습니다. 파티션 파일은 max_workers개 스레드로 동시에 읽습니다."""
+        columns = ['Date', 'Code'] + list(fields)
+        files = sorted(glob.glob(os.path.join(self.root, 'month=*', 'part-*.parquet')))
+        if not files:
+            return pd.DataFrame(columns=columns)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parts = list(executor.map(lambda f: pd.read_parquet(f, columns=columns), files))
+        frame = pd.concat(parts, ignore_index=True)
+        frame = frame.drop_duplicates(['Date', 'Code'], keep='last')
+        return frame.sort_values(['Code', 'Date']).reset_index(drop=True)
+
+    def consolidate(self, path=consolidated_price_path, max_workers=8):
+        """
+        전 종목을 (Code, Date) 정렬된 비압축 Arrow IPC 파일 하나로 내보냅니다.
+        read_consolidated로 메모리 매핑해 읽으면 파티션을 다시 읽지 않고 바로 불러올 수 있습니다.
+        """
+        table = pa.Table.from_pandas(self.read_all(max_workers=max_workers), preserve_index=False)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+
+    def read_wide(self, codes, start, end, field='Close'):
+        """(날짜 x 종목) 매트릭스"""
+        frame = self.read(codes, start, end, fields=[field])
+        wide = frame.pivot(index='Date', columns='Code', values=field)
+        return wide.reindex(columns=list(codes)).sort_index()
+
+    def history(self, code, start=None, end=None, fields=FIELDS):
+        """단일 종목을 FinanceDataReader와 같은 형태(Date 인덱스)로 반환합니다."""
+        cov = self.coverage(code)
+        if cov is None:
+            return pd.DataFrame(columns=list(fields))
+        start = start if start is not None else cov[0]
+        end = end if end is not None else cov[1]
+        frame = self.read([code], start, end, fields=fields)
+        return frame.set_index('Date')[list(fields)]
+
+    # ---------- 누락 구간 채우기 ----------
+    def missing_ranges(self, code, start, end):
+        start = pd.Timestamp(start).normalize()
+        session = last_session(end)
+        cov = self.coverage(code)
+        if cov is None:
+            return [(start, pd.Timestamp(end))]
+        have_start, have_end, checked = cov
+        ranges = []
+        if start < have_start:
+            ranges.append((start, have_start - pd.Timedelta(days=1)))
+        if checked < session:
+            # 마지막 봉은 장중에 저장됐을 수 있으므로 다시 받아 덮어씁니다.
+            ranges.append((have_end, pd.Timestamp(end)))
+        return ranges
+
+    def ensure(self, codes, start, end, max_workers=1, limiter=None):
+        """
+        저장소에 없는 구간만 내려받아 채웁니다.
+        max_workers개 스레드로 동시에 조회하고(limiter로 초당 호출 수 제한), 같은 구간 결과는 한 번에 기록합니다.
+        """
+        session = last_session(end)
+        codes = list(dict.fromkeys(codes))
+        jobs = [(code, s, e) for code in codes for s, e in self.missing_ranges(code, start, end)]
+        misses = len({code for code, _, _ in jobs})
+        metrics.inc('cache_hits_total', len(codes) - misses, cache='price_store')
+        metrics.inc('cache_misses_total', misses, cache='price_store')
+        if not jobs:
+            return
+
+        @bind_context
+        def fetch(job):
+            code, s, e = job
+            if limiter is not None:
+                with metrics.span('rate_limit_wait_seconds', limiter='price'):
+                    limiter.acquire()
+            try:
+                with metrics.span('price_fetch_seconds'):
+                    df = self.fetcher(code, s, e)
+                metrics.inc('price_fetch_total', status='ok')
+                return df
+            except Exception as exc:
+                metrics.inc('price_fetch_total', status='error')
+                logger.warning(f"{code} 시세 조회 실패: {exc}")
+                return exc
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fetch, jobs))
+
+        batches = {}
+        for (code, s, e), df in zip(jobs, results):
+            checked = session if e >= session else None
+            if isinstance(df, Exception):
+                continue
+            if df is None or df.empty:
+                self.mark_checked(code, s, checked)
+                continue
+            frame = df[FIELDS].copy()
+            frame.index.name = 'Date'
+            frame = frame.reset_index()
+            frame['Code'] = code
+            batches.setdefault((s, checked), []).append(frame)
+
+        for (s, checked), frames in batches.items():
+            self.write(pd.concat(frames, ignore_index=True), start=s, checked=checked)
+
+    def mark_checked(self, code, start, checked):
+        # 조회 결과가 비어도 (상장 전 / 휴장일) 같은 구간을 다시 조회하지 않도록 기록합니다.
+        with self._lock:
+            self._index = self._load_index()
+            if code in self._index.index:
+                old = self._index.loc[code]
+                self._index.loc[code, 'start'] = min(old['start'], start)
+                if checked is not None:
+                    self._index.loc[code, 'checked'] = max(old['checked'], checked)
+            else:
+                self._index.loc[code, ['start', 'end', 'checked']] = [start, start, checked if checked is not None else start]
+            self._index = self._index.astype('datetime64[ns]')
+            self._save_index()
+
+
+def read_consolidated(path=consolidated_price_path):
+    """PriceStore.consolidate로 만든 Arrow 파일을 메모리 매핑으로 읽습니다."""
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+_default_store = None
+
+
+def default_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
+
+
+def set_default_store(store):
+    global _default_store
+    _default_store = store
@@ -0,0 +1,94 @@
+# minervini/core/token_manager.py
+import asyncio
+import threading
+from datetime import datetime, timedelta
+import requests
+from loguru import logger
+from config import api_key, api_secret_key, host
+from utils.market_session import KST, now_kst
+
+
+class TokenProvider:
+    """
+    프로세스 전역 접근토큰 캐시.
+    KiwoomTR / AsyncKiwoomTR / WebSocketClient가 같은 토큰을 공유하고,
+    만료 refresh_margin초 전에 백그라운드 타이머가 미리 재발급합니다.
+    """
+
+    def __init__(self, refresh_margin=600):
+        self.refresh_margin = refresh_margin
+        self.token = None
+        self.expires_at = None
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _valid(self):
+        return self.token is not None and now_kst() < self.expires_at - timedelta(seconds=self.refresh_margin)
+
+    def _issue(self):
+        endpoint = '/oauth2/token'
+        url =  host + endpoint
+
+        headers = {
+            'Content-Type': 'application/json;charset=UTF-8'
+        }
+
+        params = {
+            'grant_type': 'client_credentials',
+            'appkey': api_key,
+            'secretkey': api_secret_key
+        }
+
+        response = requests.post(url, headers=headers, json=params)
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            error_message = f"HTTP Error: {e}\nResponse Body: {response.text}"
+            raise requests.HTTPError(error_message) from e
+        body = response.json()
+        self.token = body['token']
+        if body.get('expires_dt'):
+            self.expires_at = datetime.strptime(body['expires_dt'], '%Y%m%d%H%M%S').replace(tzinfo=KST)
+        else:
+            self.expires_at = now_kst() + timedelta(hours=12)
+        logger.info(f"토큰 발급 성공 (만료: {self.expires_at:%Y-%m-%d %H:%M:%S})")
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = (self.expires_at - now_kst()).total_seconds() - self.refresh_margin
+        self._timer = threading.Timer(min(max(delay, 1), threading.TIMEOUT_MAX), self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        try:
+            with self._lock:
+                self._issue()
+        except Exception as e:
+            logger.exception(f"토큰 재발급 실패: {e}")
+            self._timer = threading.Timer(30, self._background_refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def get_token(self):
+        if self._valid():
+            return self.token
+        with self._lock:
+            if not self._valid():
+                self._issue()
+            return self.token
+
+    async def get_token_async(self):
+        # 유효한 토큰이 있으면 I/O 없이 반환, 발급이 필요하면 스레드에서 (동시 호출은 lock으로 1회만 발급)
+        if self._valid():
+            return self.token
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self):
+        with self._lock:
+            self.token = None
+
+
+token_provider = TokenProvider()
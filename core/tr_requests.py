@@ -1,6 +1,8 @@
 # minervini/core/utils.py
 import requests
-from config import api_key, api_secret_key, host
+from config import host
+from core.token_manager import token_provider
+from core.metrics import metrics
 from loguru import logger
 import functools
 import time
@@ -18,35 +20,18 @@ def log_exceptions(func):
 
 class KiwoomTR:
     def __init__(self):
-        self.token = self.login()
+        self.login()
+
+    @property
+    def token(self):
+        return token_provider.get_token()
 
     @staticmethod
     def login():
-        endpoint = '/oauth2/token'
-        url =  host + endpoint
-
-        headers = {
-            'Content-Type': 'application/json;charset=UTF-8'
-        }
-
-        params = {
-            'grant_type': 'client_credentials',
-            'appkey': api_key,
-            'secretkey': api_secret_key
-        }
-
-        response = requests.post(url, headers=headers, json=params)
-        try:
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            error_message = f"HTTP Error: {e}\nResponse Body: {response.text}"
-            raise requests.HTTPError(error_message) from e
-        token = response.json()['token']
-        logger.info("토큰 발급 성공")
-        return token
+        # 프로세스 전역 토큰 재사용 (만료 전 백그라운드 재발급)
+        return token_provider.get_token()
     
-    @log_exceptions
-    def fn_ka10099(self, data, cont_yn='N', next_key=''):
+    def _post(self, api_id, data, cont_yn='N', next_key=''):
         endpoint = '/api/dostk/stkinfo'
         url = host + endpoint
 
@@ -55,36 +40,28 @@ class KiwoomTR:
             'authorization': f'Bearer {self.token}', # 접근토큰
             'cont-yn': cont_yn, # 연속조회여부
             'next-key': next_key, # 연속조회키
-            'api-id': 'ka10099', # TR명
+            'api-id': api_id, # TR명
         }
 
-        response = requests.post(url, headers=headers, json=data)
+        with metrics.span('kiwoom_tr_seconds', api_id=api_id):
+            response = requests.post(url, headers=headers, json=data)
+        metrics.inc('kiwoom_tr_calls_total', api_id=api_id, status=response.status_code)
+        metrics.inc('kiwoom_tr_response_bytes_total', len(response.content), api_id=api_id)
         try:
             response.raise_for_status()
         except requests.HTTPError as e:
             error_message = f"HTTP Error: {e}\nResponse Body: {response.text}"
             raise requests.HTTPError(error_message) from e
+        return response
+
+    @log_exceptions
+    def fn_ka10099(self, data, cont_yn='N', next_key=''):
+        response = self._post('ka10099', data, cont_yn, next_key)
         return response.json()['list']
     
     @log_exceptions
     def fn_ka10100(self, data, cont_yn='N', next_key=''):
-        endpoint = '/api/dostk/stkinfo'
-        url = host + endpoint
-        
-        headers = {
-            'Content-Type': 'application/json;charset=UTF-8',
-            'authorization': f'Bearer {self.token}', # 접근토큰
-            'cont-yn': cont_yn, # 연속조회여부
-            'next-key': next_key, # 연속조회키
-            'api-id': 'ka10100', # TR명
-        }
-        
-        response = requests.post(url, headers=headers, json=data)
-        try:
-            response.raise_for_status()
-        except requests.HTTPError as e:
-            error_message = f"HTTP Error: {e}\nResponse Body: {response.text}"
-            raise requests.HTTPError(error_message) from e
+        response = self._post('ka10100', data, cont_yn, next_key)
         
         has_next = response.headers.get('cont-yn') == 'Y'
         next_key = response.headers.get('next-key', '')
@@ -1,26 +1,34 @@
+import asyncio
 import websockets
 import json
 from loguru import logger
-from core.tr_requests import KiwoomTR
+from core.token_manager import token_provider
+from core.metrics import metrics
 
 
 class WebSocketClient:
-	def __init__(self, uri):
+	def __init__(self, uri, condition_name="트렌드 템플릿"):
 		self.uri = uri
 		self.websocket = None
 		self.connected = False
 		self.keep_running = True
-		kiwoom_tr = KiwoomTR()
-		self.token = kiwoom_tr.token
+		self.token = None
 		self.condition_name_to_idx_dict = dict()
-		self.target_condition_name = "트렌드 템플릿"
+		self.target_condition_name = condition_name
 		self.condition_results = []
+		self.logged_in = None
+		self.search_done = None
+		self.search_type = '0'
+		self.on_condition_event = None  # async (종목코드, 편입 여부) 콜백
 
 	# WebSocket 서버에 연결합니다.
 	async def connect(self):
 		try:
 			logger.info("서버와 연결을 시도 중입니다.")
-			self.websocket = await websockets.connect(self.uri)
+			self.token = await token_provider.get_token_async()
+			self.logged_in = asyncio.get_running_loop().create_future()
+			with metrics.span('kiwoom_ws_seconds', op='connect'):
+				self.websocket = await websockets.connect(self.uri)
 			self.connected = True
 			
 			# 로그인 패킷
@@ -41,12 +49,15 @@ class WebSocketClient:
 	async def send_message(self, message):
 		if not self.connected:
 			await self.connect()  # 연결이 끊어졌다면 재연결
+		trnm = message.get('trnm', '') if isinstance(message, dict) else ''
 		if self.connected:
 			# message가 문자열이 아니면 JSON으로 직렬화
 			if not isinstance(message, str):
 				message = json.dumps(message)
 
 		await self.websocket.send(message)
+		metrics.inc('kiwoom_ws_messages_total', direction='sent', trnm=trnm)
+		metrics.inc('kiwoom_ws_bytes_total', len(message.encode('utf-8')), direction='sent')
 		logger.info(f'Message sent: {message}')
 
 	# 서버에서 오는 메시지를 수신하여 출력합니다.
@@ -54,16 +65,21 @@ class WebSocketClient:
 		while self.keep_running:
 			try:
 				# 서버로부터 수신한 메시지를 JSON 형식으로 파싱
-				response = json.loads(await self.websocket.recv())
+				message = await self.websocket.recv()
+				response = json.loads(message)
 				tr_name = response.get('trnm')
+				metrics.inc('kiwoom_ws_messages_total', direction='received', trnm=tr_name or '')
+				metrics.inc('kiwoom_ws_bytes_total', len(message.encode('utf-8') if isinstance(message, str) else message), direction='received')
 
 				# 메시지 유형이 LOGIN일 경우 로그인 시도 결과 체크
 				if tr_name == 'LOGIN':
 					if response.get('return_code') != 0:
 						logger.info('로그인 실패하였습니다. : ', response.get('return_msg'))
+						self._fail(self.logged_in, RuntimeError(f"로그인 실패: {response.get('return_msg')}"))
 						await self.disconnect()
 					else:
 						logger.info('로그인 성공하였습니다.')
+						self._resolve(self.logged_in, True)
 
 				# 메시지 유형이 PING일 경우 수신값 그대로 송신
 				elif tr_name == 'PING':
@@ -74,18 +90,24 @@ class WebSocketClient:
 						self.condition_name_to_idx_dict[condition_name] = condition_idx
 						if condition_name == self.target_condition_name:
 							await self.req_condition_general_result(condition_name)
+					if self.target_condition_name not in self.condition_name_to_idx_dict:
+						self._fail(self.search_done, ValueError(f"조건식을 찾을 수 없습니다: {self.target_condition_name}"))
 				elif tr_name == 'CNSRREQ':  # 조건검색 요청 일반 결과 수신
 					logger.info(f'결과: {response}')
+					if response.get('return_code', 0) != 0:
+						self._fail(self.search_done, RuntimeError(f"조건검색 실패: {response.get('return_msg')}"))
+						continue
 					for per_stock_info_map in response.get('data', []):
-						종목코드 = per_stock_info_map['9001'].replace("_AL", "").replace("A", "")
-						종목명 = per_stock_info_map['302']
-						현재가 = per_stock_info_map['10']
-						전일대비 = per_stock_info_map['11']
-						등락율 = per_stock_info_map['12']
-						누적거래량 = per_stock_info_map['13']
-						시가 = per_stock_info_map['16']
-						고가 = per_stock_info_map['17']
-						저가 = per_stock_info_map['18']
+						# 실시간(search_type=1) 등록 응답은 종목코드(jmcode)만 내려옵니다.
+						종목코드 = (per_stock_info_map.get('9001') or per_stock_info_map.get('jmcode', '')).replace("_AL", "").replace("A", "")
+						종목명 = per_stock_info_map.get('302')
+						현재가 = per_stock_info_map.get('10')
+						전일대비 = per_stock_info_map.get('11')
+						등락율 = per_stock_info_map.get('12')
+						누적거래량 = per_stock_info_map.get('13')
+						시가 = per_stock_info_map.get('16')
+						고가 = per_stock_info_map.get('17')
+						저가 = per_stock_info_map.get('18')
 						
 						self.condition_results.append({
 							"종목코드": 종목코드,
@@ -110,6 +132,24 @@ class WebSocketClient:
 							f"고가: {고가}, "
 							f"저가: {저가}, "
 						)
+
+					# 연속조회 페이지가 남아 있으면 이어서 요청, 마지막 페이지에서 완료 처리
+					if response.get('cont_yn') == 'Y':
+						await self.req_condition_general_result(
+							self.target_condition_name, cont_yn='Y', next_key=response.get('next_key', '')
+						)
+					else:
+						self._resolve(self.search_done, self.condition_results)
+				elif tr_name == 'REAL':  # 실시간 조건검색 편입(I)/이탈(D)
+					for item in response.get('data', []):
+						if item.get('type') != '02':
+							continue
+						values = item.get('values', {})
+						종목코드 = (values.get('9001') or item.get('item', '')).replace("_AL", "").replace("A", "")
+						inserted = values.get('843') == 'I'
+						logger.info(f"조건검색 실시간 {'편입' if inserted else '이탈'}: {종목코드}")
+						if self.on_condition_event is not None:
+							await self.on_condition_event(종목코드, inserted)
 				else:
 					logger.info(f'실시간 시세 서버 응답 수신: {response}')
 
@@ -117,17 +157,50 @@ class WebSocketClient:
 				logger.info('Connection closed by the server')
 				self.connected = False
 				await self.websocket.close()
+				error = ConnectionError('조회 완료 전에 연결이 종료되었습니다.')
+				self._fail(self.logged_in, error)
+				self._fail(self.search_done, error)
+				break
+
+	@staticmethod
+	def _resolve(future, result):
+		if future is not None and not future.done():
+			future.set_result(result)
+
+	@staticmethod
+	def _fail(future, error):
+		if future is not None and not future.done():
+			future.set_exception(error)
+
+	# 조건검색 결과(연속조회 포함)가 모두 도착하면 반환합니다.
+	# search_type '1'이면 이후 편입/이탈이 REAL 메시지로 on_condition_event에 전달됩니다.
+	async def search_condition(self, timeout=30, search_type='0'):
+		if not self.connected:
+			raise ConnectionError('웹소켓 서버에 연결되지 않았습니다.')
+		self.search_type = search_type
+		self.condition_results = []
+		self.search_done = asyncio.get_running_loop().create_future()
+
+		async def _search():
+			await self.logged_in
+			await self.send_message({
+				'trnm': 'CNSRLST', # TR명
+			})
+			return await self.search_done
+
+		with metrics.span('kiwoom_ws_seconds', op='search'):
+			return await asyncio.wait_for(_search(), timeout)
 				
-	async def req_condition_general_result(self, condition_name):
+	async def req_condition_general_result(self, condition_name, cont_yn='N', next_key=''):
 		condition_idx = self.condition_name_to_idx_dict[condition_name]
 		logger.info(f"{condition_name} 조건 검색 결과 조회")
 		await self.send_message({
 			'trnm': 'CNSRREQ',  # 서비스명
 			'seq': f'{condition_idx}',  # 조건검색식 일련번호
-			'search_type': '0',  # 조회타입
+			'search_type': self.search_type,  # 조회타입 (0: 일반, 1: 실시간)
 			'stex_tp': 'K',  # 거래소구분
-			'cont_yn': 'N',  # 연속조회여부
-			'next_key': ''  # 연속조회키
+			'cont_yn': cont_yn,  # 연속조회여부
+			'next_key': next_key  # 연속조회키
 		})
 	
 	
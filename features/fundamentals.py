@@ -1,73 +1,171 @@
 # minervini/core/fundamentals.py
-from multiprocessing import Pool, cpu_count
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-import time, random
-from bs4 import BeautifulSoup
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
+from config import naver_host, fundamentals_cache_path
+from utils.rate_limiter import RateLimiter
+from core.metrics import metrics, bind_context
 
-def get_code33_worker(stock):
-    options = Options()
-    options.add_argument("--headless")
-    
-    chromedriver_path = r"C:\Users\YOON\Desktop\YGY\파이썬\kiwoom_rest\strategies\minervini\chromedriver\chromedriver.exe"
-
-    service = Service(executable_path=chromedriver_path)
-    driver = webdriver.Chrome(service=service, options=options)
-    
-    try:
-        driver.get(f"https://m.stock.naver.com/domestic/stock/{stock}/finance/quarter")
-        time.sleep(random.uniform(4, 6))
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        tables = soup.select("table")
-        
-        if len(tables) < 2:
-            return None  # 구조가 다르면 스킵
-
-        table_html = str(tables[1])
-        table_df_list = pd.read_html(table_html)
-        table_df = table_df_list[0]
-
-        table_df.set_index("기간", inplace=True)
-        table_df.index.name = ""
-        table_df = table_df.rename(columns=lambda x: x.replace("최근3개월 전망치 평균", ""))
-        table_df = table_df.T
-
-        table_df = table_df.replace("-", pd.NA)
-        table_df = table_df.apply(pd.to_numeric, errors="coerce")
-        table_df["매출증가율"] = table_df["매출액"].pct_change()
-        table_df["순이익증가율"] = table_df["순이익률"].pct_change()
-        table_df["EPS증가율"] = table_df["EPS"].pct_change()
-
-        code33 = table_df[["EPS증가율", "매출증가율", "순이익증가율"]].iloc[-4:-1, :]
-        row = [stock] + list(code33.values.T.flatten())
-        return row
-    except Exception as e:
-        logger.exception(f"[ERROR] {stock}: {e}")
+METRICS = ['매출액', '순이익률', 'EPS']
+
+
+def expected_quarter(today=None):
+    """
+    today 기준으로 실적이 공시됐어야 하는 마지막 분기 키 (YYYYMM).
+    분기보고서는 분기 종료 후 45일, 사업보고서(4분기)는 90일 이내 공시.
+    """
+    today = today or date.today()
+    quarter_end = pd.Period(today, freq='Q').start_time.date() - timedelta(days=1)
+    while True:
+        deadline = 90 if quarter_end.month == 12 else 45
+        if quarter_end + timedelta(days=deadline) <= today:
+            return quarter_end.strftime('%Y%m')
+        quarter_end = pd.Period(quarter_end, freq='Q').start_time.date() - timedelta(days=1)
+
+
+def parse_quarter_finance(body):
+    """네이버 분기 실적 JSON -> {분기 키: {지표: 값}} (컨센서스 컬럼 제외)"""
+    info = body.get('financeInfo') or {}
+    keys = [t['key'] for t in info.get('trTitleList', []) if t.get('isConsensus') != 'Y']
+    quarters = {key: {} for key in keys}
+    for row in info.get('rowList', []):
+        if row.get('title') not in METRICS:
+            continue
+        for key in keys:
+            value = (row.get('columns', {}).get(key) or {}).get('value')
+            number = pd.to_numeric(str(value).replace(',', ''), errors='coerce')
+            quarters[key][row['title']] = None if pd.isna(number) else float(number)
+    return quarters
+
+
+class FundamentalsCache:
+    """
+    (종목코드, 분기) 단위 실적 영구 캐시 (JSON).
+    이미 받은 분기는 다시 받지 않고, 새 분기가 공시됐어야 하는 종목만 하루 한 번 재조회합니다.
+    """
+
+    def __init__(self, path=fundamentals_cache_path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def quarters(self, code):
+        return self.entries.get(code, {}).get('quarters', {})
+
+    def needs_fetch(self, code, today=None):
+        today = today or date.today()
+        entry = self.entries.get(code)
+        if entry is None:
+            return True
+        if entry['fetched'] == today.isoformat():
+            return False
+        return max(entry['quarters'], default='') < expected_quarter(today)
+
+    def update(self, code, quarters):
+        with self._lock:
+            entry = self.entries.setdefault(code, {'quarters': {}})
+            entry['quarters'].update(quarters)
+            entry['fetched'] = date.today().isoformat()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # 동시에 저장하는 다른 스레드와 임시 파일이 겹치지 않도록
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+class FundamentalsFetcher:
+    """커넥션 풀을 공유하는 requests.Session + 고정 크기 스레드 풀로 분기 실적 JSON을 조회합니다."""
+
+    def __init__(self, max_workers=8, rate=10):
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = 'Mozilla/5.0'
+
+    def fetch(self, stock):
+        with metrics.span('rate_limit_wait_seconds', limiter='naver'):
+            self.limiter.acquire()
+        with metrics.span('naver_request_seconds'):
+            response = self.session.get(f"{naver_host}/api/stock/{stock}/finance/quarter", timeout=10)
+        metrics.inc('naver_requests_total', status=response.status_code)
+        metrics.inc('naver_response_bytes_total', len(response.content))
+        response.raise_for_status()
+        return parse_quarter_finance(response.json())
+
+    def fetch_many(self, stocks, cache):
+        # 워커 스레드의 span도 호출한 요청의 타이밍 요약에 포함
+        @bind_context
+        def worker(stock):
+            try:
+                cache.update(stock, self.fetch(stock))
+            except Exception as e:
+                metrics.inc('naver_errors_total')
+                logger.exception(f"[ERROR] {stock}: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(worker, stocks))
+
+    def close(self):
+        self.session.close()
+
+
+def get_code33(stock, cache):
+    quarters = cache.quarters(stock)
+    if len(quarters) < 4:
         return None
-    finally:
-        driver.quit()
-        
-def add_fundamental(df):
-    logger.info("펀더멘탈 병렬 크롤링 중...")
+
+    table_df = pd.DataFrame.from_dict(quarters, orient='index').sort_index()
+    table_df = table_df.reindex(columns=METRICS).apply(pd.to_numeric, errors="coerce")
+    table_df["매출증가율"] = table_df["매출액"].pct_change()
+    table_df["순이익증가율"] = table_df["순이익률"].pct_change()
+    table_df["EPS증가율"] = table_df["EPS"].pct_change()
+
+    # 최근 3개 분기 (실적 확정분)
+    code33 = table_df[["EPS증가율", "매출증가율", "순이익증가율"]].iloc[-3:, :]
+    row = [stock] + list(code33.values.T.flatten())
+    return row
+
+def add_fundamental(df, cache=None, fetcher=None):
+    logger.info("펀더멘탈 조회 중...")
 
     stock_list = list(df["종목코드"])
+    cache = cache or FundamentalsCache()
 
-    with Pool(processes=cpu_count()) as pool:
-        results = pool.map(get_code33_worker, stock_list)
+    stale = [stock for stock in stock_list if cache.needs_fetch(stock)]
+    metrics.inc('cache_hits_total', len(stock_list) - len(stale), cache='fundamentals')
+    metrics.inc('cache_misses_total', len(stale), cache='fundamentals')
+    if stale:
+        logger.info(f"분기 실적 조회: {len(stale)}종목 (캐시 {len(stock_list) - len(stale)}종목)")
+        fetcher = fetcher or FundamentalsFetcher()
+        try:
+            fetcher.fetch_many(stale, cache)
+        finally:
+            fetcher.close()
+        cache.save()
 
     df_rows = []
-    for stock, row in zip(stock_list, results):
-        if row is None:
-            logger.warning(f"[WARN] {stock} 펀더멘탈 없음")
-            continue
-        if len(row) != 10:
-            logger.warning(f"[WARN] {stock} 데이터 길이 불일치")
-            continue
-        df_rows.append(row)
+    with metrics.span('feature_compute_seconds', feature='fundamental'):
+        for stock in stock_list:
+            row = get_code33(stock, cache)
+            if row is None:
+                logger.warning(f"[WARN] {stock} 펀더멘탈 없음")
+                continue
+            df_rows.append(row)
 
     df_merge = pd.DataFrame(df_rows, columns=[
         "종목코드",
@@ -77,4 +175,4 @@ def add_fundamental(df):
     ])
 
     new_df = pd.merge(left=df, right=df_merge, how="outer", on="종목코드")
-    return new_df
\ No newline at end of file
+    return new_df
@@ -1,25 +1,101 @@
 import asyncio
+import json
+import os
+import threading
+from datetime import date, timedelta
 from loguru import logger
-from core.tr_requests import KiwoomTR
-
-
-async def fetch_industry_name(kiwoom_tr, stock_code, semaphore):
-    async with semaphore:
-        params = {'stk_cd': stock_code}
-        loop = asyncio.get_event_loop()
-        up_name, has_next, next_key = await loop.run_in_executor(
-            None,
-            lambda: kiwoom_tr.fn_ka10100(data=params)
-        )
-        await asyncio.sleep(1)  # 제한 속도 유지
-        return up_name
+from core.async_tr_requests import AsyncKiwoomTR
+from core.metrics import metrics
+from config import industry_cache_path, industry_cache_max_age_days
+
+
+class IndustryCache:
+    """
+    종목코드 -> 업종명 영구 캐시 (JSON).
+    max_age_days가 지난 항목은 만료로 보고 다시 조회합니다.
+    """
+
+    def __init__(self, path=industry_cache_path, max_age_days=industry_cache_max_age_days):
+        self.path = path
+        self.max_age = timedelta(days=max_age_days)
+        self.entries = {}
+        self.warmed_up = None
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                saved = json.load(f)
+            self.entries = saved.get('entries', {})
+            self.warmed_up = saved.get('warmed_up')
+
+    def _fresh(self, updated):
+        return date.today() - date.fromisoformat(updated) <= self.max_age
+
+    def get(self, code):
+        entry = self.entries.get(code)
+        if entry is None or not self._fresh(entry['updated']):
+            return None
+        return entry['name']
+
+    def missing(self, codes):
+        return [code for code in codes if self.get(code) is None]
+
+    def needs_warm_up(self):
+        return self.warmed_up is None or not self._fresh(self.warmed_up)
+
+    def update(self, mapping):
+        today = date.today().isoformat()
+        for code, name in mapping.items():
+            if name:
+                self.entries[code] = {'name': name, 'updated': today}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # 작업 큐 / 동시 요청이 같은 파일을 저장할 수 있으므로 임시 파일은 프로세스 / 스레드마다 따로
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'warmed_up': self.warmed_up, 'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    async def warm_up(self, kiwoom_tr, markets=('0', '10')):
+        """ka10099 종목정보 리스트로 시장 전체 업종명을 한 번에 채웁니다. (0: 코스피, 10: 코스닥)"""
+        for market in markets:
+            stocks = await kiwoom_tr.fn_ka10099(data={'mrkt_tp': market})
+            if not stocks:
+                logger.warning(f"ka10099 종목 리스트 조회 실패: mrkt_tp={market}")
+                return
+            self.update({stock['code']: stock.get('upName') for stock in stocks})
+        self.warmed_up = date.today().isoformat()
+        logger.info(f"업종명 캐시 갱신: {len(self.entries)}종목")
+
+
+async def fetch_industry_name(kiwoom_tr, stock_code):
+    # 호출 속도는 AsyncKiwoomTR의 토큰 버킷이 조절합니다.
+    try:
+        return await kiwoom_tr.fn_ka10100(data={'stk_cd': stock_code})
+    except Exception as e:
+        logger.exception(f'{stock_code} 업종명 조회 실패: {e}')
+        return None
     
-async def add_industry_names_parallel(df):
+async def add_industry_names_parallel(df, cache=None):
 	logger.info("업종명 조회")
-	kiwoom_tr = KiwoomTR()
-	semaphore = asyncio.Semaphore(15)  # 동시에 20개만 호출 허용
+	cache = cache or IndustryCache()
+	codes = df['종목코드'].tolist()
+	missing = cache.missing(codes)
+	metrics.inc('cache_hits_total', len(codes) - len(missing), cache='industry')
+	metrics.inc('cache_misses_total', len(missing), cache='industry')
+
+	if cache.needs_warm_up() or missing:
+		async with AsyncKiwoomTR() as kiwoom_tr:
+			if cache.needs_warm_up():
+				await cache.warm_up(kiwoom_tr)
+
+			# 캐시에 없는 종목만 ka10100 조회
+			missing = cache.missing(codes)
+			if missing:
+				logger.info(f"ka10100 조회: {len(missing)}종목")
+				tasks = [fetch_industry_name(kiwoom_tr, code) for code in missing]
+				up_names = await asyncio.gather(*tasks)
+				cache.update(dict(zip(missing, up_names)))
+		cache.save()
 
-	tasks = [fetch_industry_name(kiwoom_tr, code, semaphore) for code in df['종목코드']]
-	up_names = await asyncio.gather(*tasks)
-	df['업종명'] = up_names
-	return df
\ No newline at end of file
+	df['업종명'] = df['종목코드'].map(cache.get)
+	return df
@@ -1,32 +1,47 @@
 # minervini/core/rs_calculator.py
-import FinanceDataReader as fdr
-from ta.trend import SMAIndicator
 from datetime import datetime, timedelta
 import pandas as pd
 from loguru import logger
+from core.price_loader import PriceWindow, load_prices
+from core.metrics import metrics
 
-def add_mansfield_rs(df, market_code='KS11', ma_length=52):
+
+def mansfield_rs(prices: pd.DataFrame, market: pd.Series, ma_length=52):
+    """
+    (날짜 x 종목) 종가 매트릭스 전체에 대해 Mansfield RS를 한 번에 계산합니다.
+
+    반환: (Mansfield RS 매트릭스, 날짜별 RS 백분위 순위 매트릭스)
+    """
+    market = market.reindex(prices.index)
+    valid = market.notna() & prices.notna().any(axis=1)
+    prices, market = prices[valid], market[valid]
+
+    rs = prices.div(market, axis=0) * 100
+    zero_line = rs.rolling(window=ma_length).mean()
+    mansfield = (rs / zero_line - 1) * 100
+    rank = mansfield.rank(axis=1, pct=True) * 100
+    return mansfield, rank
+
+
+def rs_window(end=None, market_code='KS11', ma_length=52):
+    end = end or datetime.today()
+    return PriceWindow(end - timedelta(weeks=(ma_length + 10)), ['Close'], [market_code])
+
+
+def add_mansfield_rs(df, prices=None, market_code='KS11', ma_length=52, store=None):
     logger.info("Mansfield Relative Strength 계산")
-    end = datetime.today()
-    start = end - timedelta(weeks=(ma_length + 10))
-    
+    window = rs_window(market_code=market_code, ma_length=ma_length)
+
     codes = df['종목코드'].tolist()
-    
-    df_list = [fdr.DataReader(code, start, end)[['Close']].resample('D').last() for code in codes]
-    stock_df = pd.concat(df_list, axis=1)
-    stock_df.columns = [code for code in codes]
-    market_df = fdr.DataReader(market_code, start, end)[['Close']].resample('D').last()
-    market_df.rename(columns={'Close': '지수'}, inplace=True)
-    combined = stock_df.join(market_df, how='inner').dropna()
-    
-    mansfield_dict = {}
-    for code in stock_df.columns:
-        rs = (combined[code] / combined['지수']) * 100
-        # zero_line = SMAIndicator(rs, window=ma_length).sma_indicator()
-        zero_line = rs.rolling(window=ma_length).mean()
-        mansfield = ((rs.iloc[-1] / zero_line.iloc[-1]) - 1) * 100
-        mansfield_dict[code] = round(mansfield, 2)
-        
-    df['Mansfield_RS'] = df['종목코드'].map(mansfield_dict)
-    return df
+    if prices is None:
+        prices = load_prices(codes, [window], store=store)
 
+    with metrics.span('feature_compute_seconds', feature='rs'):
+        stock_df = prices.wide(codes, 'Close', start=window.start)
+        market = prices.wide([market_code], 'Close', start=window.start)[market_code]
+        mansfield, rank = mansfield_rs(stock_df, market, ma_length=ma_length)
+
+        # 종목별 마지막 유효값 (거래정지 종목은 직전 값)
+        df['Mansfield_RS'] = df['종목코드'].map(mansfield.ffill().iloc[-1].round(2))
+        df['RS_Rank'] = df['종목코드'].map(rank.ffill().iloc[-1].round(1))
+    return df
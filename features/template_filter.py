@@ -1,7 +1,15 @@
+from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
+from loguru import logger
+from core.price_loader import PriceWindow, load_prices
+from core.price_store import default_store
+from core.metrics import metrics
 
 def check_trend_template(df: pd.DataFrame) -> bool:
+    # 단일 종목 기준 구현 (스크리너 파이프라인은 check_trend_template_batch 사용)
+    import pandas_ta as ta
+
     # 필요한 컬럼이 있는지 확인
     if not all(col in df.columns for col in ['Close']):
         raise ValueError("DataFrame must contain 'Close' column")
@@ -40,3 +48,78 @@ def check_trend_template(df: pd.DataFrame) -> bool:
 
     # 전체 조건 평가
     return all([cond1, cond2, cond3, cond4, cond5, cond6])
+
+
+TREND_CONDITIONS = ['cond1', 'cond2', 'cond3', 'cond4', 'cond5', 'cond6']
+
+
+def check_trend_template_batch(close: pd.DataFrame) -> pd.DataFrame:
+    """
+    (날짜 x 종목) 종가 매트릭스 전체에 check_trend_template 조건을 한 번에 적용합니다.
+
+    반환: 종목별 cond1~cond6 및 전체 통과 여부(passed) bool 테이블
+    """
+    history = close.notna().sum().to_numpy()
+    tail = close.iloc[-260:]  # 52주 = 260 거래일 기준, SMA 200 최근 20일 계산에도 충분
+
+    sma_50 = tail.rolling(50).mean().to_numpy()
+    sma_150 = tail.rolling(150).mean().to_numpy()
+    sma_200 = tail.rolling(200).mean().to_numpy()
+    prices = tail.to_numpy(dtype='float64')
+
+    latest = prices[-1]
+    s50, s150, s200 = sma_50[-1], sma_150[-1], sma_200[-1]
+
+    with np.errstate(invalid='ignore'):
+        table = pd.DataFrame({
+            # 1. 주가 > 150일선, 200일선
+            'cond1': (latest > s150) & (latest > s200),
+            # 2. 150일선 > 200일선
+            'cond2': s150 > s200,
+            # 3. 50일선 > 150일선, 200일선
+            'cond3': (s50 > s150) & (s50 > s200),
+            # 4. 주가 > 50일선
+            'cond4': latest > s50,
+            # 5. 주가 > 52주 중간값
+            'cond5': latest > (np.nanmax(prices, axis=0) + np.nanmin(prices, axis=0)) / 2,
+            # 6. 200일선이 1개월 이상 상승 중 (최근 20일 단조 증가)
+            'cond6': (np.diff(sma_200[-20:], axis=0) >= 0).all(axis=0) & ~np.isnan(sma_200[-20:]).any(axis=0),
+        }, index=close.columns)
+
+    # 최근 200일 이상 데이터 필요
+    table.loc[history < 200, TREND_CONDITIONS] = False
+    table['passed'] = table[TREND_CONDITIONS].all(axis=1)
+    return table
+
+
+def trend_template_window(end=None):
+    end = end or datetime.today()
+    return PriceWindow(end - timedelta(days=400), ['Close'])
+
+
+def screen_trend_template(codes, end=None, store=None, prices=None) -> pd.DataFrame:
+    """
+    종가 매트릭스로 여러 종목(전체 시장)을 한 번에 평가합니다.
+    prices: 이미 읽어 둔 PriceBundle (스크리너 파이프라인의 공유 시세). 없으면 가격 저장소에서 읽습니다.
+    """
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today()
+    window = trend_template_window(end)
+    if prices is None:
+        close = (store or default_store()).read_wide(codes, window.start, end, 'Close')
+    else:
+        close = prices.wide(codes, 'Close', start=window.start)
+    return check_trend_template_batch(close)
+
+
+def add_trend_template(df, prices=None, store=None):
+    logger.info("Trend Template 평가")
+    window = trend_template_window()
+
+    codes = df['종목코드'].tolist()
+    if prices is None:
+        prices = load_prices(codes, [window], store=store)
+
+    with metrics.span('feature_compute_seconds', feature='trend_template'):
+        table = screen_trend_template(list(dict.fromkeys(codes)), prices=prices)
+        df['trend_template'] = df['종목코드'].map(table['passed'])
+    return df
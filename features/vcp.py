@@ -1,11 +1,22 @@
-import FinanceDataReader as fdr
 from datetime import datetime
+import pandas as pd
 from pandas.tseries.offsets import BDay
 from ta.volatility import BollingerBands
 from scipy.signal import find_peaks
 from scipy.stats import linregress
 import numpy as np
 from loguru import logger
+from core.price_loader import PriceWindow, PriceBundle, load_prices
+from core.price_store import default_store
+from core.metrics import metrics
+
+try:
+    from numba import njit
+except ImportError:  # numba가 없으면 같은 커널을 순수 Python으로 실행
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 
 def detect_vcp(df,
@@ -53,26 +64,156 @@ def detect_vcp(df,
     return df, bb_squeeze, low_vol, contraction_check
     
 
-def add_vcp(df):
+@njit(cache=True)
+def _local_maxima(x):
+    # scipy.signal.find_peaks의 극대점 탐색 (평탄 구간은 가운데 인덱스)
+    midpoints = np.empty(x.shape[0] // 2, dtype=np.int64)
+    m = 0
+    i = 1
+    i_max = x.shape[0] - 1
+    while i < i_max:
+        if x[i - 1] < x[i]:
+            i_ahead = i + 1
+            while i_ahead < i_max and x[i_ahead] == x[i]:
+                i_ahead += 1
+            if x[i_ahead] < x[i]:
+                midpoints[m] = (i + i_ahead - 1) // 2
+                m += 1
+                i = i_ahead
+        i += 1
+    return midpoints[:m]
+
+
+@njit(cache=True)
+def _select_by_distance(peaks, priority, distance):
+    # 높은 극대점부터 distance 미만으로 가까운 이웃 제거 (find_peaks(distance=...)와 동일)
+    keep = np.ones(peaks.shape[0], dtype=np.bool_)
+    order = np.argsort(priority)
+    for i in range(peaks.shape[0] - 1, -1, -1):
+        j = order[i]
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and peaks[j] - peaks[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < peaks.shape[0] and peaks[k] - peaks[j] < distance:
+            keep[k] = False
+            k += 1
+    return peaks[keep]
+
+
+@njit(cache=True)
+def _swing_points(close, distance):
+    peaks = _local_maxima(close)
+    peaks = _select_by_distance(peaks, close[peaks], distance)
+    inverted = -close
+    troughs = _local_maxima(inverted)
+    troughs = _select_by_distance(troughs, inverted[troughs], distance)
+    return np.sort(np.concatenate((peaks, troughs)))
+
+
+@njit(cache=True)
+def _contraction_kernel(high, low, close, distance):
+    """
+    (봉 위치 x 종목) 매트릭스의 종목별로 스윙 포인트 두 칸 간격 구간의 수축 깊이를 계산합니다.
+    반환: (직전보다 얕아진 수축 횟수, 마지막 수축 깊이)
+    """
+    n_codes = close.shape[1]
+    counts = np.zeros(n_codes, dtype=np.int64)
+    last = np.full(n_codes, np.nan)
+    for c in range(n_codes):
+        first = 0
+        while first < close.shape[0] and np.isnan(close[first, c]):
+            first += 1
+        swing = _swing_points(np.ascontiguousarray(close[first:, c]), distance)
+        prev = np.nan
+        for i in range(2, swing.shape[0]):
+            start = first + swing[i - 2]
+            end = first + swing[i]
+            hi = np.nanmax(high[start:end, c])
+            lo = np.nanmin(low[start:end, c])
+            depth = (hi - lo) / hi
+            if i > 2 and prev > depth:
+                counts[c] += 1
+            prev = depth
+        last[c] = prev
+    return counts, last
+
+
+def detect_vcp_batch(high, low, close, volume,
+           bb_window=20, bb_std=2, slope_length=30,
+           vol_ma_window=50, peak_distance=7,
+           min_contractions=3, max_last_contraction=0.1):
+    """
+    detect_vcp를 여러 종목에 한 번에 적용합니다.
+    입력은 PriceBundle.aligned 형태의 (봉 위치 x 종목) 매트릭스이고,
+    종목별 수축 횟수 / 마지막 수축 깊이 / BB 폭 기울기와 판정 결과를 담은 테이블을 반환합니다.
+    """
+    # Bollinger Band 폭 (ta.volatility.BollingerBands.bollinger_wband와 동일)
+    mavg = close.rolling(bb_window).mean()
+    mstd = close.rolling(bb_window).std(ddof=0)
+    wband = ((mavg + bb_std * mstd) - (mavg - bb_std * mstd)) / mavg * 100
+
+    # 최근 slope_length개 BB 폭의 회귀 기울기 (결측이 있으면 NaN)
+    y = wband.iloc[-slope_length:].to_numpy()
+    x = np.arange(len(y)) - (len(y) - 1) / 2
+    with np.errstate(invalid='ignore'):
+        bb_slope = (x[:, None] * (y - y.mean(axis=0))).sum(axis=0) / (x ** 2).sum()
+
+    # 마지막 봉 거래량 < 50일 평균 거래량
+    vol_ma = volume.rolling(vol_ma_window).mean()
+    low_volume = (volume.iloc[-1] < vol_ma.iloc[-1]).to_numpy() if len(volume) else np.zeros(close.shape[1], dtype=bool)
+
+    counts, last = _contraction_kernel(
+        high.to_numpy(dtype='float64'), low.to_numpy(dtype='float64'),
+        close.to_numpy(dtype='float64'), peak_distance
+    )
+
+    with np.errstate(invalid='ignore'):
+        is_contracting = (counts >= min_contractions) & (last <= max_last_contraction)
+        table = pd.DataFrame({
+            'contractions': counts,
+            'last_contraction': last,
+            'bb_slope': bb_slope,
+            'bb': bb_slope < 0,
+            'low_volume': low_volume,
+            'is_contracting': is_contracting,
+            'vcp_ready': low_volume & is_contracting,
+        }, index=close.columns)
+    return table
+
+
+def vcp_window(end=None):
+    end = end or datetime.today()
+    return PriceWindow(end - BDay(100), ['High', 'Low', 'Close', 'Volume'])
+
+
+def screen_vcp(codes=None, end=None, store=None, prices=None) -> pd.DataFrame:
+    """
+    여러 종목(기본: 가격 저장소의 전체 시장)을 한 번에 평가합니다.
+    prices: 이미 읽어 둔 PriceBundle (스크리너 파이프라인의 공유 시세). 없으면 가격 저장소에서 읽습니다.
+    """
+    store = store or default_store()
+    codes = list(codes) if codes is not None else store.tickers()
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.today()
+    window = vcp_window(end)
+    if prices is None:
+        prices = PriceBundle(store.read(codes, window.start, end, fields=window.fields))
+    return detect_vcp_batch(*(prices.aligned(codes, field, window.start) for field in window.fields))
+
+
+def add_vcp(df, prices=None, store=None):
     logger.info("Detect VCP(Volatility Contraction Pattern)")
-    end = datetime.today()
-    start = end - BDay(100)
-    
+    window = vcp_window()
+
     codes = df['종목코드'].tolist()
-    bb_dict = {}
-    low_vol_dict = {}
-    is_contracting_dict = {}
-    vcp_ready_dict = {}
-    for code in codes:
-        stock_df = fdr.DataReader(code, start, end)
-        stock_df_vcp, bb, low_vol, is_contracting = detect_vcp(stock_df)
-        bb_dict[code] = bb
-        low_vol_dict[code] = low_vol
-        is_contracting_dict[code] = is_contracting
-        vcp_ready_dict[code] = stock_df_vcp['vcp_ready'].iloc[-1]
-    
-    df['bb'] = df['종목코드'].map(bb_dict)
-    df['low_volume'] = df['종목코드'].map(low_vol_dict)
-    df['is_contracting'] = df['종목코드'].map(is_contracting_dict)
-    df['vcp_ready'] = df['종목코드'].map(vcp_ready_dict)
-    return df    
+    if prices is None:
+        prices = load_prices(codes, [window], store=store)
+
+    with metrics.span('feature_compute_seconds', feature='vcp'):
+        table = screen_vcp(dict.fromkeys(codes), store=store, prices=prices)
+        for column in ['bb', 'low_volume', 'is_contracting', 'vcp_ready']:
+            df[column] = df['종목코드'].map(table[column])
+    return df
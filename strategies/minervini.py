@@ -2,36 +2,84 @@
 import asyncio 
 import pandas as pd
 
-from config import socket_url
-from features.rs_calculator import add_mansfield_rs
+from config import socket_url, condition_search_timeout, condition_name as default_condition_name
+from features.rs_calculator import add_mansfield_rs, rs_window
 from core.websocket_client import WebSocketClient
+from core.condition_session import condition_session
 from features.industry import add_industry_names_parallel
-from features.vcp import add_vcp
+from features.vcp import add_vcp, vcp_window
+from features.template_filter import add_trend_template, trend_template_window
+from features.fundamentals import add_fundamental
+from core.price_loader import load_prices
+from strategies.pipeline import Stage, Pipeline
+from core.metrics import metrics
 from loguru import logger
 
-async def run_minervini():
-	logger.info("Start filtering")
+async def search_condition(condition_name):
+	# 앱 수명 세션이 실시간으로 유지 중인 편입 종목이 있으면 그대로 사용
+	if condition_session.is_ready(condition_name):
+		logger.info("실시간 조건검색 세션의 편입 종목 사용")
+		metrics.inc('cache_hits_total', cache='condition_session')
+		return condition_session.snapshot()
+	metrics.inc('cache_misses_total', cache='condition_session')
+
 	# WebSocketClient 전역 변수 선언
-	websocket_client = WebSocketClient(socket_url)
-
-	# WebSocket 클라이언트를 백그라운드에서 실행합니다.
-	receive_task = asyncio.create_task(websocket_client.run())
-
-	# 실시간 항목 등록
-	await asyncio.sleep(1)
-	await websocket_client.send_message({ 
-		'trnm': 'CNSRLST', # TR명
-	})
-
-	# 수신 작업이 종료될 때까지 대기
-	await asyncio.sleep(1)
-	await websocket_client.disconnect()
-	await receive_task
-	
-	df = pd.DataFrame(websocket_client.condition_results)
-	df = await add_industry_names_parallel(df)	
-	df = add_mansfield_rs(df)
-	df = add_vcp(df)
-	# df = add_fundamental(df)
-
-	return df
\ No newline at end of file
+	websocket_client = WebSocketClient(socket_url, condition_name=condition_name)
+
+	# 연결 후 수신 루프를 백그라운드에서 실행합니다.
+	await websocket_client.connect()
+	receive_task = asyncio.create_task(websocket_client.receive_messages())
+
+	# 조건검색 결과(연속조회 포함)가 모두 도착할 때까지 대기
+	try:
+		return await websocket_client.search_condition(timeout=condition_search_timeout)
+	finally:
+		await websocket_client.disconnect()
+		await receive_task
+
+
+def load_stage_prices(df):
+	# Trend Template / RS / VCP가 필요로 하는 구간과 컬럼을 합쳐 종목당 한 번만 조회
+	return load_prices(df['종목코드'].tolist(), [trend_template_window(), rs_window(), vcp_window()])
+
+
+# 각 단계는 inputs로 선언한 산출물만 기다리고 나머지와는 동시에 실행됩니다.
+# io: 이벤트 루프, thread: 블로킹 I/O / 공유 시세 뷰
+ENRICHMENTS = [
+	Stage('industry', add_industry_names_parallel, columns=['업종명'], kind='io'),
+	Stage('prices', load_stage_prices, kind='thread'),
+	Stage('trend', add_trend_template, inputs=('base', 'prices'), columns=['trend_template'], kind='thread'),
+	Stage('rs', add_mansfield_rs, inputs=('base', 'prices'), columns=['Mansfield_RS', 'RS_Rank'], kind='thread'),
+	Stage('vcp', add_vcp, inputs=('base', 'prices'), columns=['bb', 'low_volume', 'is_contracting', 'vcp_ready'], kind='thread'),
+	Stage('fundamental', add_fundamental, columns=[
+		"Q1 EPS증가율", "Q2 EPS증가율", "Q3 EPS증가율",
+		"Q1 매출증가율", "Q2 매출증가율", "Q3 매출증가율",
+		"Q1 순이익증가율", "Q2 순이익증가율", "Q3 순이익증가율"
+	], kind='thread'),
+]
+
+pipeline = Pipeline(ENRICHMENTS)
+
+
+async def stream_minervini(condition_name=default_condition_name):
+	"""
+	조건검색 결과를 ('rows', df)로 먼저 내보낸 뒤,
+	각 단계가 끝나는 순서대로 (단계 이름, 종목코드 + 추가 컬럼 df)를 내보냅니다.
+	실패한 단계는 (단계 이름, 예외)로 전달합니다.
+	"""
+	logger.info("Start filtering (stream)")
+	with metrics.span('screener_stage_seconds', stage='condition'):
+		df = pd.DataFrame(await search_condition(condition_name))
+	yield 'rows', df
+
+	async for name, result in pipeline.stream(df):
+		yield name, result
+
+
+async def run_minervini(condition_name=default_condition_name):
+	logger.info("Start filtering")
+	with metrics.span('screener_stage_seconds', stage='condition'):
+		condition_results = await search_condition(condition_name)
+
+	df = pd.DataFrame(condition_results)
+	return await pipeline.run(df)
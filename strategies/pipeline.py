@@ -0,0 +1,92 @@
+# minervini/strategies/pipeline.py
+import asyncio
+import time
+from loguru import logger
+from core.metrics import metrics
+
+KINDS = ('io', 'thread')
+
+
+class Stage:
+    """
+    파이프라인 단계.
+
+    name    : 단계 이름 (다른 단계의 inputs에서 참조)
+    func    : inputs 순서대로 인자를 받아 결과를 반환하는 함수
+    inputs  : 'base'(조건검색 결과) 또는 다른 단계 이름
+    columns : 결과에서 종목코드 기준으로 최종 프레임에 붙일 컬럼 (없으면 중간 산출물)
+    kind    : 'io'(코루틴, 이벤트 루프) / 'thread'(블로킹 I/O, 공유 시세 뷰 등 프로세스 내 상태를 쓰는 계산)
+    """
+
+    def __init__(self, name, func, inputs=('base',), columns=(), kind='io'):
+        if kind not in KINDS:
+            raise ValueError(f"알 수 없는 단계 종류: {kind}")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.columns = list(columns)
+        self.kind = kind
+
+    async def run(self, *args):
+        if self.kind == 'io':
+            return await self.func(*args)
+        return await asyncio.to_thread(self.func, *args)
+
+
+class Pipeline:
+    """선언된 inputs만 기다리며 독립된 단계를 동시에 실행하고, 결과를 종목코드 기준으로 합칩니다."""
+
+    def __init__(self, stages):
+        self.stages = {stage.name: stage for stage in stages}
+
+    async def _run_stage(self, stage, base, tasks):
+        args = []
+        for name in stage.inputs:
+            if name == 'base':
+                args.append(base.copy())
+            else:
+                args.append(await tasks[name])
+        started = time.perf_counter()
+        with metrics.span('screener_stage_seconds', stage=stage.name):
+            result = await stage.run(*args)
+        logger.info(f"{stage.name} 단계 완료: {time.perf_counter() - started:.2f}초")
+        if stage.columns:
+            result = result[['종목코드'] + stage.columns]
+        return result
+
+    async def stream(self, base):
+        """끝나는 순서대로 (단계 이름, 결과 또는 예외)를 내보냅니다."""
+        tasks = {}
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(self._run_stage(stage, base, tasks))
+        names = {task: name for name, task in tasks.items()}
+        try:
+            pending = set(tasks.values())
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = names[task]
+                    if task.exception() is not None:
+                        logger.opt(exception=task.exception()).error(f"{name} 단계 실패: {task.exception()}")
+                        yield name, task.exception()
+                    else:
+                        yield name, task.result()
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def run(self, base):
+        results = {}
+        async for name, result in self.stream(base):
+            if isinstance(result, Exception):
+                raise result
+            results[name] = result
+        return self.merge(base, results)
+
+    def merge(self, base, results):
+        """{단계 이름: 결과}를 종목코드 기준으로 합칩니다. 컬럼 순서는 완료 순서가 아니라 선언 순서를 따릅니다."""
+        df = base
+        for stage in self.stages.values():
+            if stage.columns:
+                df = df.merge(results[stage.name], how='left', on='종목코드')
+        return df
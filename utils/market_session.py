@@ -0,0 +1,25 @@
+# minervini/utils/market_session.py
+from datetime import datetime, time, timedelta, timezone
+
+KST = timezone(timedelta(hours=9))
+MARKET_OPEN = time(9, 0)
+MARKET_CLOSE = time(15, 30)
+
+
+def now_kst():
+    return datetime.now(KST)
+
+
+def trading_date(now=None):
+    """now 시점에 유효한 거래일 (장 시작 전/주말은 직전 영업일, 공휴일은 고려하지 않음)"""
+    now = now or now_kst()
+    day = now.date()
+    if now.time() < MARKET_OPEN:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def session_close(day):
+    return datetime.combine(day, MARKET_CLOSE, tzinfo=KST)
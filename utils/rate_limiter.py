@@ -0,0 +1,64 @@
+# minervini/utils/rate_limiter.py
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """초당 rate회 호출을 허용하는 토큰 버킷 (여러 스레드가 공유)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AsyncRateLimiter:
+    """
+    asyncio용 토큰 버킷. 대기 중에도 이벤트 루프를 막지 않습니다.
+    토큰을 lock 안에서 먼저 예약(음수 허용)하고 부족분만큼 잠들기 때문에
+    서로 다른 스레드 / 이벤트 루프(작업 큐 워커)가 하나의 한도를 순서대로 나눠 씁니다.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc):
+        return False
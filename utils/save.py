@@ -1,10 +1,12 @@
+# 실행: python -m utils.save [--mode sync|full]
 import FinanceDataReader as fdr
-import os
+import argparse
 import time
-
-# 저장 폴더
-DIR = 'data'
-os.makedirs(DIR, exist_ok=True)
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from core.price_store import default_store, last_session
+from utils.rate_limiter import RateLimiter
 
 # 날짜 범위
 START_DATE = '2020-01-01'
@@ -16,14 +18,8 @@ def fetch_stock_data(ticker):
         if df.empty:
             print(f"{ticker} 데이터 없음")
             return False
-        df['종목코드'] = ticker  # 종목코드 추가
-
-        # Parquet 저장: 종목코드별로 폴더 나눠 저장
-        df.to_parquet(
-            os.path.join(DIR, f"{ticker}.parquet"),
-            engine='pyarrow',
-            index=True  # 날짜 인덱스 유지
-        )
+        # 공용 가격 저장소에 저장 (월 파티션)
+        default_store().put(ticker, df, start=START_DATE)
 
         print(f"저장 완료: {ticker}")
         return True
@@ -31,6 +27,71 @@ def fetch_stock_data(ticker):
         print(f"{ticker} 처리 중 오류 발생: {e}")
         return False
 
+def fetch_missing(store, ticker, end, limiter):
+    # 종목별 high-water mark 이후(및 START_DATE 이전 누락분)만 조회
+    frames = []
+    for s, e in store.missing_ranges(ticker, START_DATE, end):
+        limiter.acquire()
+        df = fdr.DataReader(ticker, start=s, end=e)
+        if df is not None and not df.empty:
+            frames.append(df)
+    return frames
+
+
+def sync(max_workers=8, rate=5, retries=3):
+    store = default_store()
+    end = datetime.today()
+    session = last_session(end)
+    limiter = RateLimiter(rate)
+
+    tickers = fdr.StockListing('KOSPI')['Code'].tolist() + ['KS11']
+    pending = [t for t in tickers if store.missing_ranges(t, START_DATE, end)]
+    print(f"동기화 대상: {len(pending)} / {len(tickers)}")
+
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        if attempt:
+            time.sleep(2 ** attempt)
+            print(f"재시도 {attempt}회차: {len(pending)}종목")
+
+        failed, fetched, empty = [], [], []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch_missing, store, t, end, limiter): t for t in pending}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    frames = future.result()
+                except Exception as e:
+                    print(f"{ticker} 처리 중 오류 발생: {e}")
+                    failed.append(ticker)
+                    continue
+                if not frames:
+                    empty.append(ticker)
+                    continue
+                for df in frames:
+                    df = df[['Open', 'High', 'Low', 'Close', 'Volume']].copy()
+                    df.index.name = 'Date'
+                    df = df.reset_index()
+                    df['Code'] = ticker
+                    fetched.append(df)
+
+        # 성공한 종목은 한 번에 기록 (월 파티션마다 part 파일 하나)
+        if fetched:
+            store.write(pd.concat(fetched, ignore_index=True), start=START_DATE, checked=session)
+        for ticker in empty:
+            store.mark_checked(ticker, pd.Timestamp(START_DATE), session)
+        print(f"저장 완료: {len(fetched)}건, 신규 봉 없음: {len(empty)}종목, 실패: {len(failed)}종목")
+        pending = failed
+
+    store.compact()
+    # 백테스트용 통합 파일 갱신 (메모리 매핑 로드)
+    store.consolidate()
+
+    print("=== 실패 종목 리스트 ===")
+    print(pending)
+
+
 def main():
     kospi = fdr.StockListing('KOSPI')
     fail_list = []
@@ -46,8 +107,21 @@ def main():
     if not success:
         fail_list.append('KS11')
         
+    default_store().compact()
+    default_store().consolidate()
+        
     print("=== 실패 종목 리스트 ===")
     print(fail_list)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['sync', 'full'], default='sync')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=5, help='초당 최대 조회 수')
+    parser.add_argument('--retries', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.mode == 'sync':
+        sync(max_workers=args.workers, rate=args.rate, retries=args.retries)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,454 @@
+# 실행: python -m utils.screener_benchmark [--tickers 100] [--runs 3] [--requests 100 --concurrency 10] [--market 2500]
+#
+# 실제 키움/네이버/FDR 대신 같은 프로세스 안의 대역 서버로 스크리너 지연 시간을 측정합니다.
+# - 키움 REST: /oauth2/token, /api/dostk/stkinfo (ka10099 / ka10100 / ka10001)
+# - 키움 웹소켓: LOGIN / CNSRLST / CNSRREQ (연속조회 포함)
+# - 네이버 분기 실적: /api/stock/{종목코드}/finance/quarter
+# - 시세: fdr.DataReader 대신 결정적인 합성 일봉 (PriceStore fetcher)
+# config는 import 시점에 환경변수를 읽으므로, 대역 서버 주소를 환경변수로 지정한 뒤 앱 모듈을 불러옵니다.
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import websockets
+from aiohttp import web
+from loguru import logger
+
+from utils.market_session import now_kst
+
+HISTORY_START = '2015-01-01'
+INDUSTRIES = ['반도체', '화학', '제약', '자동차', '철강', '은행', '소프트웨어', '유통']
+
+
+class FakeMarket:
+    """대역 서버와 시세 대역이 공유하는 결정적인 합성 종목 유니버스 (조건검색 결과 = 전 종목)"""
+
+    def __init__(self, n_tickers=100, seed=0):
+        self.seed = seed
+        self.codes = [f"{900000 + i:06d}" for i in range(n_tickers)]
+        self.names = {code: f"벤치{i:04d}" for i, code in enumerate(self.codes)}
+        self.industries = {code: INDUSTRIES[i % len(INDUSTRIES)] for i, code in enumerate(self.codes)}
+        # 거래일 달력과 종목별 전체 일봉은 한 번만 생성 (대역 자체의 CPU 시간이 측정값에 섞이지 않도록)
+        self.days = pd.bdate_range(HISTORY_START, date.today(), name='Date')
+        self._histories = {}
+        self._lock = threading.Lock()
+
+    def _rng(self, code, salt=0):
+        return np.random.default_rng([self.seed, zlib.crc32(code.encode()), salt])
+
+    def _generate(self, code):
+        days = self.days
+        rng = self._rng(code)
+        close = 10000 * np.exp(np.cumsum(rng.normal(0.0004, 0.02, len(days))))
+        open_ = close * np.exp(rng.normal(0, 0.005, len(days)))
+        df = pd.DataFrame({
+            'Open': np.round(open_),
+            'High': np.round(np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, len(days))))),
+            'Low': np.round(np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, len(days))))),
+            'Close': np.round(close),
+            'Volume': np.round(rng.lognormal(12, 0.7, len(days))),
+        }, index=days)
+        df['Change'] = df['Close'].pct_change()
+        return df
+
+    def history(self, code, start=None, end=None):
+        """fdr.DataReader와 같은 형태의 일봉 (Date 인덱스, Open/High/Low/Close/Volume/Change)"""
+        with self._lock:
+            df = self._histories.get(code)
+        if df is None:
+            df = self._generate(code)
+            with self._lock:
+                df = self._histories.setdefault(code, df)
+        return df.loc[pd.Timestamp(start or HISTORY_START):pd.Timestamp(end or date.today())].copy()
+
+    def quote(self, code):
+        """ka10001 응답 필드"""
+        last = self.history(code).iloc[-2:]
+        close, prev = last['Close'].iloc[-1], last['Close'].iloc[0]
+        return {
+            'stk_cd': code,
+            'stk_nm': self.names.get(code, code),
+            'cur_prc': f"{close:.0f}",
+            'pred_pre': f"{close - prev:+.0f}",
+            'flu_rt': f"{(close / prev - 1) * 100:+.2f}",
+            'trde_qty': f"{last['Volume'].iloc[-1]:.0f}",
+            'open_pric': f"{last['Open'].iloc[-1]:.0f}",
+            'high_pric': f"{last['High'].iloc[-1]:.0f}",
+            'low_pric': f"{last['Low'].iloc[-1]:.0f}",
+            'return_code': 0,
+        }
+
+    def condition_row(self, code):
+        """CNSRREQ 일반 조회 결과 한 줄"""
+        quote = self.quote(code)
+        return {
+            '9001': f"A{code}", '302': quote['stk_nm'], '10': quote['cur_prc'], '11': quote['pred_pre'],
+            '12': quote['flu_rt'], '13': quote['trde_qty'], '16': quote['open_pric'],
+            '17': quote['high_pric'], '18': quote['low_pric'],
+        }
+
+    def quarter_finance(self, code):
+        """네이버 분기 실적 JSON (최근 5개 분기)"""
+        quarters = pd.period_range(end=pd.Period(date.today(), freq='Q') - 1, periods=5, freq='Q')
+        keys = [q.end_time.strftime('%Y%m') for q in quarters]
+        rng = self._rng(code, 1)
+        sales = 1000 * np.cumprod(1 + rng.normal(0.03, 0.05, len(keys)))
+        rows = {
+            '매출액': sales,
+            '순이익률': rng.normal(8, 3, len(keys)),
+            'EPS': 500 * np.cumprod(1 + rng.normal(0.05, 0.1, len(keys))),
+        }
+        return {'financeInfo': {
+            'trTitleList': [{'key': key, 'isConsensus': 'N'} for key in keys],
+            'rowList': [
+                {'title': title, 'columns': {key: {'value': f"{value:,.2f}"} for key, value in zip(keys, values)}}
+                for title, values in rows.items()
+            ],
+        }}
+
+
+class FakePriceFetcher:
+    """fdr.DataReader(code, start, end) 대역. PriceStore.ensure의 스레드에서 호출될 때마다 latency초 지연"""
+
+    def __init__(self, market, latency=0.05):
+        self.market = market
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, code, start=None, end=None):
+        time.sleep(self.latency)
+        self.calls += 1
+        return self.market.history(code, start, end)
+
+
+def kiwoom_http_app(market, latency=0.02, page_size=500):
+    """키움 REST (토큰 / 종목정보) + 네이버 분기 실적 대역. 요청마다 latency초 지연"""
+
+    async def token(request):
+        await asyncio.sleep(latency)
+        expires = now_kst() + timedelta(hours=12)
+        return web.json_response({'token': 'bench-token', 'expires_dt': expires.strftime('%Y%m%d%H%M%S'),
+                                  'return_code': 0})
+
+    async def stkinfo(request):
+        await asyncio.sleep(latency)
+        data = await request.json()
+        api_id = request.headers.get('api-id')
+        if api_id == 'ka10099':
+            # 짝수 순번은 코스피(0), 홀수 순번은 코스닥(10)
+            codes = [code for i, code in enumerate(market.codes) if ('0', '10')[i % 2] == data.get('mrkt_tp')]
+            offset = int(request.headers.get('next-key') or 0) if request.headers.get('cont-yn') == 'Y' else 0
+            has_next = offset + page_size < len(codes)
+            body = {'list': [{'code': code, 'name': market.names[code], 'upName': market.industries[code]}
+                             for code in codes[offset:offset + page_size]], 'return_code': 0}
+            headers = {'cont-yn': 'Y' if has_next else 'N', 'next-key': str(offset + page_size) if has_next else ''}
+            return web.json_response(body, headers=headers)
+        if api_id == 'ka10100':
+            return web.json_response({'upName': market.industries.get(data.get('stk_cd')), 'return_code': 0})
+        if api_id == 'ka10001':
+            return web.json_response(market.quote(data.get('stk_cd')))
+        return web.json_response({'return_code': 1, 'return_msg': f"지원하지 않는 api-id: {api_id}"}, status=400)
+
+    async def quarter(request):
+        await asyncio.sleep(latency)
+        return web.json_response(market.quarter_finance(request.match_info['code']))
+
+    app = web.Application()
+    app.router.add_post('/oauth2/token', token)
+    app.router.add_post('/api/dostk/stkinfo', stkinfo)
+    app.router.add_get('/api/stock/{code}/finance/quarter', quarter)
+    return app
+
+
+def kiwoom_socket_handler(market, condition_name, latency=0.01, page_size=100):
+    """core/websocket_client.py가 기대하는 LOGIN / CNSRLST / CNSRREQ 응답 대역. 응답마다 latency초 지연"""
+
+    async def handler(websocket):
+        async for message in websocket:
+            request = json.loads(message)
+            await asyncio.sleep(latency)
+            trnm = request.get('trnm')
+            if trnm == 'LOGIN':
+                reply = {'trnm': 'LOGIN', 'return_code': 0, 'return_msg': '정상적으로 처리되었습니다'}
+            elif trnm == 'CNSRLST':
+                reply = {'trnm': 'CNSRLST', 'return_code': 0, 'data': [['0', '다른 조건식'], ['1', condition_name]]}
+            elif trnm == 'CNSRREQ':
+                offset = int(request.get('next_key') or 0) if request.get('cont_yn') == 'Y' else 0
+                page = market.codes[offset:offset + page_size]
+                has_next = offset + page_size < len(market.codes)
+                if request.get('search_type') == '1':
+                    # 실시간 등록 응답은 종목코드만
+                    data = [{'jmcode': f"A{code}"} for code in page]
+                else:
+                    data = [market.condition_row(code) for code in page]
+                reply = {'trnm': 'CNSRREQ', 'return_code': 0, 'seq': request.get('seq'), 'data': data,
+                         'cont_yn': 'Y' if has_next else 'N', 'next_key': str(offset + page_size) if has_next else ''}
+            else:
+                continue
+            await websocket.send(json.dumps(reply, ensure_ascii=False))
+
+    return handler
+
+
+class FakeServers:
+    """
+    대역 HTTP / 웹소켓 서버를 별도 스레드의 이벤트 루프에서 실행합니다 (측정 대상 루프와 분리).
+    start() 후 http_url / socket_url 사용
+    """
+
+    def __init__(self, market, condition_name, http_latency=0.02, ws_latency=0.01):
+        self.market = market
+        self.condition_name = condition_name
+        self.http_latency = http_latency
+        self.ws_latency = ws_latency
+        self.http_url = None
+        self.socket_url = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = None
+
+    async def _start(self):
+        self._runner = web.AppRunner(kiwoom_http_app(self.market, self.http_latency))
+        await self._runner.setup()
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        await web.SockSite(self._runner, sock).start()
+        self.http_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+        handler = kiwoom_socket_handler(self.market, self.condition_name, self.ws_latency)
+        self._ws_server = await websockets.serve(handler, '127.0.0.1', 0)
+        self.socket_url = f"ws://127.0.0.1:{self._ws_server.sockets[0].getsockname()[1]}/api/dostk/websocket"
+
+    async def _stop(self):
+        self._ws_server.close()
+        await self._ws_server.wait_closed()
+        await self._runner.cleanup()
+
+    def _serve(self, ready):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._start())
+        ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), daemon=True)
+        self._thread.start()
+        if not ready.wait(10):
+            raise RuntimeError("대역 서버 시작 실패")
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+
+
+def configure(servers, workdir, condition_name, cache_ttl):
+    """앱 모듈을 불러오기 전에 대역 서버 주소와 빈 캐시 경로를 환경변수로 지정합니다."""
+    if 'config' in sys.modules:
+        raise RuntimeError("config가 이미 로드되어 대역 서버 주소를 적용할 수 없습니다")
+    os.environ.update({
+        'KIWOOM_HOST': servers.http_url,
+        'KIWOOM_SOCKET_URL': servers.socket_url,
+        'NAVER_STOCK_HOST': servers.http_url,
+        'API_KEY': 'bench',
+        'API_SECRET_KEY': 'bench',
+        'PRICE_STORE_DIR': os.path.join(workdir, 'ohlcv'),
+        'INDUSTRY_CACHE_PATH': os.path.join(workdir, 'industry.json'),
+        'FUNDAMENTALS_CACHE_PATH': os.path.join(workdir, 'fundamentals.json'),
+        'CONDITION_NAME': condition_name,
+        'FILTER_CACHE_TTL': str(cache_ttl),
+        'REALTIME_CONDITION': '0',
+    })
+
+
+def percentiles(values):
+    values = np.asarray(values, dtype='float64')
+    return {
+        'mean': float(values.mean()),
+        'p50': float(np.percentile(values, 50)),
+        'p90': float(np.percentile(values, 90)),
+        'p99': float(np.percentile(values, 99)),
+        'max': float(values.max()),
+    }
+
+
+async def measure_stages(runs=3):
+    """
+    stream_minervini(run_minervini와 같은 조건검색 + 파이프라인)를 runs번 실행해 단계별 지연 시간(초)을 잽니다.
+    condition: 조건검색, 각 단계: 입력(조건검색 결과 / 선행 단계)이 준비된 뒤 끝날 때까지, total: 전체
+    첫 실행은 시세/업종/실적 캐시가 비어 있는 상태입니다.
+    """
+    from strategies.minervini import stream_minervini, pipeline
+    from config import condition_name
+
+    rows = []
+    for run in range(runs):
+        started = time.perf_counter()
+        done = {}
+        async for name, result in stream_minervini(condition_name):
+            done[name] = time.perf_counter() - started
+            if isinstance(result, Exception):
+                raise result
+
+        row = {'run': run, 'cache': 'cold' if run == 0 else 'warm', 'condition': done['rows']}
+        for name, stage in pipeline.stages.items():
+            ready = max(done['rows' if i == 'base' else i] for i in stage.inputs)
+            row[name] = done[name] - ready
+        row['total'] = max(done.values())
+        rows.append(row)
+        logger.info(f"{run}번 실행: {row['total']:.2f}s")
+    return pd.DataFrame(rows).set_index('run')
+
+
+async def measure_load(requests=100, concurrency=10, refresh=False, poll_interval=0.05):
+    """
+    같은 이벤트 루프의 앱에 스크리닝 요청을 concurrency개씩 동시에 보내 응답 시간 분포를 잽니다.
+    요청 하나 = POST /filter로 작업 등록 -> GET /jobs/{job_id}/result가 끝날 때까지 폴링
+    """
+    import httpx
+    from app.main import app
+
+    latencies, ok = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://screener', timeout=None) as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                job = (await client.post('/filter', params={'refresh': str(refresh).lower()})).json()
+                while True:
+                    response = await client.get(f"/jobs/{job['job_id']}/result")
+                    if response.status_code != 202:
+                        break
+                    await asyncio.sleep(poll_interval)
+                latencies.append(time.perf_counter() - started)
+                ok.append(response.status_code == 200 and response.json().get('status') == 'success')
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': ok.count(False),
+        'throughput': requests / elapsed,
+        **percentiles(latencies),
+    }
+
+
+def measure_market(n_tickers=2500, seed=0, market_code='KS11'):
+    """
+    전 종목 규모의 합성 시세(PriceBundle 하나)로 배치 평가 함수만 실행해 계산 시간(초)을 잽니다.
+    시세 조회 / 대역 서버 지연은 포함하지 않습니다.
+    """
+    from core.price_loader import PriceBundle
+    from features.template_filter import screen_trend_template, trend_template_window
+    from features.rs_calculator import mansfield_rs, rs_window
+    from features.vcp import screen_vcp, vcp_window
+
+    universe = FakeMarket(n_tickers + 1, seed)
+    codes, index_code = universe.codes[:-1], universe.codes[-1]
+    start = min(w.start for w in [trend_template_window(), rs_window(), vcp_window()])
+    frames = []
+    for code in universe.codes:
+        history = universe.history(code, start).drop(columns='Change')
+        history['Code'] = market_code if code == index_code else code
+        frames.append(history.reset_index())
+    prices = PriceBundle(pd.concat(frames, ignore_index=True))
+
+    seconds = {}
+    started = time.perf_counter()
+    screen_trend_template(codes, prices=prices)
+    seconds['trend_template'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    window = rs_window(market_code=market_code)
+    mansfield_rs(prices.wide(codes, 'Close', start=window.start),
+                 prices.wide([market_code], 'Close', start=window.start)[market_code])
+    seconds['rs'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    screen_vcp(codes, prices=prices)
+    seconds['vcp'] = time.perf_counter() - started
+    return seconds
+
+
+async def benchmark(args):
+    stages = await measure_stages(args.runs)
+    load = await measure_load(args.requests, args.concurrency, args.refresh) if args.requests else None
+    return stages, load
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tickers', type=int, default=100, help='조건검색 결과 종목 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--condition', default='트렌드 템플릿')
+    parser.add_argument('--runs', type=int, default=3, help='단계별 측정 반복 횟수 (첫 실행은 빈 캐시)')
+    parser.add_argument('--requests', type=int, default=100, help='POST /filter 부하 요청 수 (0이면 생략)')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--refresh', action='store_true', help='부하 요청에 refresh=true')
+    parser.add_argument('--cache-ttl', type=int, default=0, help='FILTER_CACHE_TTL (0이면 요청마다 스크리닝)')
+    parser.add_argument('--http-latency', type=float, default=0.02, help='키움 REST / 네이버 응답 지연 (초)')
+    parser.add_argument('--ws-latency', type=float, default=0.01, help='키움 웹소켓 응답 지연 (초)')
+    parser.add_argument('--price-latency', type=float, default=0.05, help='시세 조회 지연 (초)')
+    parser.add_argument('--market', type=int, default=2500, help='배치 평가 계산 시간을 잴 전 종목 수 (0이면 생략)')
+    parser.add_argument('--market-target', type=float, default=1.0,
+                        help='전 종목 Trend Template 평가 목표 시간 (초). 넘으면 종료 코드 1')
+    parser.add_argument('--out', default=None, help='결과 JSON 경로')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level='WARNING')
+
+    market = FakeMarket(args.tickers, args.seed)
+    servers = FakeServers(market, args.condition, args.http_latency, args.ws_latency).start()
+    workdir = tempfile.mkdtemp(prefix='screener-bench-')
+    try:
+        configure(servers, workdir, args.condition, args.cache_ttl)
+        from core.price_store import PriceStore, set_default_store
+        from config import price_store_dir
+        fetcher = FakePriceFetcher(market, args.price_latency)
+        set_default_store(PriceStore(price_store_dir, fetcher=fetcher))
+
+        stages, load = asyncio.run(benchmark(args))
+        market_seconds = measure_market(args.market, args.seed) if args.market else None
+    finally:
+        servers.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"단계별 지연 시간 (초, {args.tickers}종목, 시세 조회 {fetcher.calls}회)")
+    print(stages.round(3).to_string())
+    if load:
+        print(f"\nPOST /filter 부하 ({load['requests']}건, 동시 {load['concurrency']}, 오류 {load['errors']}건)")
+        print(f"  처리량 {load['throughput']:.2f}건/s, "
+              f"p50 {load['p50']:.3f}s, p90 {load['p90']:.3f}s, p99 {load['p99']:.3f}s, 최대 {load['max']:.3f}s")
+
+    if market_seconds:
+        print(f"\n전 종목 배치 평가 ({args.market}종목, 1회 계산 시간)")
+        print("  " + ", ".join(f"{name} {value:.3f}s" for name, value in market_seconds.items()))
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'stages': stages.reset_index().to_dict(orient='records'), 'load': load, 'market': market_seconds},
+                      f, ensure_ascii=False, indent=2)
+
+    if market_seconds and market_seconds['trend_template'] > args.market_target:
+        print(f"Trend Template 평가가 목표 {args.market_target:.2f}s를 넘었습니다: "
+              f"{market_seconds['trend_template']:.3f}s", file=sys.stderr)
+        sys.exit(1)